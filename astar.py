@@ -1,21 +1,69 @@
 import math
 import heapq
+import time
+from array import array
+from jps import JumpPointSearch
+from connectivity import ConnectivityIndex
+from hpa import HierarchicalGraph
+from landmarks import Landmarks
+from flowfield import FlowField
+from neighbors import NeighborMasks, check_costs, octile
+from open_list import QUEUES
+from path_cache import PathCache, next_version
 
 ROW = 9
 COL = 10
-ROOT2 = math.sqrt(2)
+INF = float('inf')
+STEPWISE = ('A*', 'Bidirectional', 'ARA*', 'Flow')  # Modes a_star_steps splits into steps; the others run in a single step
+
+# Flat search buffers shared by every query on the same grid, indexed by row * COL + col.
+# A cell's g/parent are only meaningful when its stamp belongs to the current generation,
+# so starting a new query is O(1) instead of allocating ROW x COL objects.
+class SearchState:
+    def __init__(self, size):
+        self.size = size
+        self.g = array('d', [INF]) * size  # Cost from start to this node
+        self.parent = array('i', [-1]) * size  # Flat index of the parent cell
+        self.stamp = array('I', [0]) * size  # 2 * generation when opened, 2 * generation + 1 when closed
+        self.generation = 0
+
+    # Invalidate every cell at once, clearing the stamps only when the counter wraps around
+    def new_generation(self):
+        self.generation += 1
+        if 2 * self.generation + 1 >= 1 << (8 * self.stamp.itemsize):
+            self.stamp = array('I', [0]) * self.size
+            self.generation = 1
+        return 2 * self.generation, 2 * self.generation + 1
+
+
+# Counters and per-phase timings of one search, collected when AStar is created with collect_stats=True
+class SearchStats:
+    COUNTERS = ('pushes', 'pops', 'stale_pops', 'reopenings', 'heuristic_evaluations', 'expanded', 'peak_open')
 
-class Cell:
     def __init__(self):
-        self.parent_i = 0
-        self.parent_j = 0
-        self.f = float('inf')  # Total cost (g + h)
-        self.g = float('inf')  # Cost from start to this node
-        self.h = 0  # Heuristic cost from this node to goal
+        self.pushes = 0  # Entries added to the open list
+        self.pops = 0  # Entries taken off the open list
+        self.stale_pops = 0  # Popped entries for cells that had already been closed
+        self.reopenings = 0  # Queued cells reached again by a cheaper route and queued once more
+        self.heuristic_evaluations = 0
+        self.expanded = 0  # Cells (jump points for JPS, abstract nodes for HPA*) whose successors were generated
+        self.peak_open = 0  # Largest size of the open list
+        self.timings = {}  # Phase -> seconds: checks, setup, search, trace
+
+    def record(self, pushes, pops, stale_pops, reopenings, heuristic_evaluations, expanded, peak_open):
+        self.pushes, self.pops, self.stale_pops, self.reopenings = pushes, pops, stale_pops, reopenings
+        self.heuristic_evaluations, self.expanded, self.peak_open = heuristic_evaluations, expanded, peak_open
+
+    def as_dict(self):
+        result = {name: getattr(self, name) for name in self.COUNTERS}
+        result.update((phase + '_s', seconds) for phase, seconds in self.timings.items())
+        return result
 
 
 class AStar:
-    def __init__(self, grid, start, dest, heuristic_type='Euclidean', imported=False):
+    def __init__(self, grid, start, dest, heuristic_type='Euclidean', imported=False, mode='A*', collect_stats=False, landmark_file=None,
+                 weight=1.0, time_budget=None, queue='heap', corner_cutting='allow'):
+        check_costs(grid)
         self.imported = imported
         self.grid = grid
         self.ROW = len(grid) if imported else ROW
@@ -23,58 +71,470 @@ class AStar:
         self.src = start
         self.dest = dest
         self.heuristic_type = heuristic_type
+        self.mode = mode  # Search engine: 'A*', 'Bidirectional', 'ARA*', 'JPS', 'JPS+', 'HPA*' or 'Flow'
+        self.weight = weight  # Heuristic weight: above 1 trades path cost for speed (the starting weight for ARA*)
+        self.weight_step = 0.5  # How much ARA* lowers the weight after each round
+        self.time_budget = time_budget  # Seconds of searching ARA* may spend improving its first path; None runs it to the optimum
+        self.bound = None  # The last path costs at most bound times the optimum (None when unknown, as for HPA*)
+        self.improvements = []  # ARA*: (path, bound) of every path the last search found, the best last
+        self.found_dest = False
+        self.queue = queue  # Open list kind for A*: 'heap', 'indexed' or 'bucket' (see open_list.py)
+        self.queues = {}  # kind -> open list, allocated once and reused by every query
+        self.corner_cutting = corner_cutting  # Corner rule for diagonal moves (see neighbors.py); JPS and HPA* fall back to A* unless 'allow'
+        self.neighbors = {}  # diagonal -> NeighborMasks, kept up to date by update_cells
+        self.open_list = None  # Open list of the last A* search
+        self.state = None  # Flat g/parent/closed buffers, allocated once and reused by every query
+        self.back_state = None  # The same buffers for the backward half of a bidirectional search
+        self.jps = {}  # (diagonal, precompute) -> JumpPointSearch kept for this grid
+        self.components = {}  # diagonal -> ConnectivityIndex, to reject unreachable queries without searching
+        self.hpa = {}  # diagonal -> HierarchicalGraph for the HPA* mode
+        self.alt = {}  # diagonal -> Landmarks for the 'ALT' heuristic
+        self.landmark_file = landmark_file  # Where the ALT distance fields are persisted, if anywhere
+        self.flows = PathCache(maxsize=16)  # (version, dest, diagonal) -> FlowField for the 'Flow' mode
+        self.abstract_path = None  # Abstract HPA* path of the last query, refined into cells by trace_path
+        self.version = next_version()  # Changes whenever update_cells reports an edit, for keying cached results
+        self.collect_stats = collect_stats
+        self.stats = None  # SearchStats of the last search when collect_stats is on
+        self.last_mark = 0.0  # perf_counter() at the end of the previous timed phase
+
+    # Point the instance at a new source/destination, keeping the search buffers
+    def set_query(self, start, dest, heuristic_type=None, mode=None, weight=None, time_budget=None):
+        self.src = start
+        self.dest = dest
+        if heuristic_type is not None: self.heuristic_type = heuristic_type
+        if mode is not None: self.mode = mode
+        if weight is not None: self.weight = weight
+        if time_budget is not None: self.time_budget = time_budget
         self.found_dest = False
-        self.open_list = []  # List of cells to be evaluated
-        self.closed_list = []  # List of cells already evaluated
-        self.cell_details = []  # Details of each cell
-        self.log = {} # Dictionary to store the path for logging
+        self.abstract_path = None
+        self.open_list = None
+
+    # Start a new generation of the search buffers, allocating them on first use
+    def new_search_state(self):
+        if self.state is None or self.state.size != self.ROW * self.COL:
+            self.state = SearchState(self.ROW * self.COL)
+        return self.state.new_generation()
+
+    # Tell the derived search structures which cells of the grid were edited in place
+    def update_cells(self, cells):
+        check_costs(self.grid, cells)
+        self.version = next_version()
+        for jps in self.jps.values(): jps.update_cells(cells)
+        for neighbors in self.neighbors.values(): neighbors.update_cells(cells)
+        for components in self.components.values(): components.update_cells(cells)
+        for hpa in self.hpa.values(): hpa.update_cells(cells)
+        for alt in self.alt.values(): alt.update_cells(cells)
+
+    # Cluster abstraction for the HPA* mode, built lazily as queries reach new clusters
+    def hierarchy(self):
+        diagonal = self.heuristic_type != 'Manhattan'
+        if diagonal not in self.hpa:
+            self.hpa[diagonal] = HierarchicalGraph(self.grid, diagonal)
+        return self.hpa[diagonal]
+
+    # Component labels for the current move set, built on first use and then kept up to date
+    def connectivity(self):
+        diagonal = self.heuristic_type != 'Manhattan'
+        if diagonal not in self.components:
+            self.components[diagonal] = ConnectivityIndex(self.grid, diagonal)
+        return self.components[diagonal]
+
+    # Landmark distance fields for the ALT heuristic, computed (or loaded from landmark_file) on first use
+    def landmarks(self):
+        diagonal = self.heuristic_type != 'Manhattan'
+        if diagonal not in self.alt:
+            self.alt[diagonal] = Landmarks(self.grid, diagonal, path=self.landmark_file, components=self.connectivity())
+        return self.alt[diagonal]
+
+    # Passable-neighbour masks for the current move set and corner rule, built on first use
+    def neighbor_masks(self):
+        diagonal = self.heuristic_type != 'Manhattan'
+        if diagonal not in self.neighbors:
+            self.neighbors[diagonal] = NeighborMasks(self.grid, diagonal, self.corner_cutting)
+        return self.neighbors[diagonal]
+
+    # Distance field towards dest for the 'Flow' mode, shared by every query to that cell on this grid version
+    def flow_field(self):
+        try: next(self.flow_steps(batch=0))
+        except StopIteration as done: return done.value
+
+    # flow_field in steps: a field that is not cached yet is built batch settled cells at a time, yielding the
+    # (settled, reached) cells like search_cells, and is only cached once complete
+    def flow_steps(self, batch=64):
+        diagonal = self.heuristic_type != 'Manhattan'
+        key = (self.version, tuple(self.dest), diagonal)
+        field = self.flows.get(key)
+        if field is None:
+            field = FlowField(self.grid, self.dest, diagonal, self.neighbor_masks(), build=False)
+            yield from field.build_steps(batch)
+            self.flows.put(key, field)
+            if self.stats: self.stats.expanded = field.settled  # Only the query that builds the field pays for it
+        return field
+
+    # Build what the current query's search relies on (component labels, neighbour masks and, for ALT, the
+    # landmark fields) ahead of time, e.g. on a background thread; a_star_steps otherwise builds them before its first step
+    def prepare(self):
+        self.connectivity()
+        self.neighbor_masks()
+        if self.heuristic_type == 'ALT': self.landmarks().refresh()
+
+    # Open list for search_cells. The bucket queue needs every f to be a multiple of 1/2, which holds for
+    # Manhattan moves over integer cell costs with a weight that is a multiple of 1/2; otherwise the heap is used
+    def open_queue(self):
+        kind = self.queue
+        if kind == 'bucket' and (self.heuristic_type != 'Manhattan' or not float(2 * self.weight).is_integer()): kind = 'heap'
+        if kind not in self.queues: self.queues[kind] = QUEUES[kind](self.ROW * self.COL)
+        self.queues[kind].clear()
+        return self.queues[kind]
+
+    # Jump Point Search engine for the current heuristic and mode, built once per grid
+    def jump_points(self):
+        key = (self.heuristic_type != 'Manhattan', self.mode == 'JPS+')
+        if key not in self.jps:
+            self.jps[key] = JumpPointSearch(self.grid, self.ROW, self.COL, diagonal=key[0], precompute=key[1])
+        return self.jps[key]
+
+    # Charge the time since the previous mark to a phase of the current stats
+    def mark(self, phase):
+        if self.stats is not None:
+            now = time.perf_counter()
+            self.stats.timings[phase] = self.stats.timings.get(phase, 0.0) + now - self.last_mark
+            self.last_mark = now
 
     # Check if given point is in the grid
     def is_valid(self, row, col): return (row >= 0) and (row < self.ROW) and (col >= 0) and (col < self.COL)
 
-    # check if the given node is unblocked
-    def is_unblocked(self, row, col): return self.grid[row][col] == 1
+    # check if the given node is unblocked; free cells hold their movement cost, walls are 0
+    def is_unblocked(self, row, col): return self.grid[row][col] != 0
 
     # Check if a cell is the destination
     def is_destination(self, row, col): return row == self.dest[0] and col == self.dest[1]
 
-    # Calculate the heuristic value of a cell (Euclidean/Manhattan/Diagonal distance to destination)
-    def calculate_h_value(self, row, col):
-        if self.heuristic_type == 'Manhattan':
-            return abs(row - self.dest[0]) + abs(col - self.dest[1])
+    # Calculate the heuristic value of a cell (Euclidean/Manhattan/Diagonal distance or ALT bound to the
+    # destination, or to target when given)
+    def calculate_h_value(self, row, col, target=None):
+        target = self.dest if target is None else target
+        if self.heuristic_type == 'ALT':
+            return self.landmarks().h(row * self.COL + col, target[0] * self.COL + target[1])
+        elif self.heuristic_type == 'Manhattan':
+            return octile(row - target[0], col - target[1], diagonal=False)
         elif self.heuristic_type == 'Diagonal':
-            return ((row - self.dest[0]) + (col - self.dest[1])) + (ROOT2 - 2 * 1) * min((row - self.dest[0]), (col - self.dest[1]))
+            return octile(row - target[0], col - target[1])
         else:  # Default to Euclidean
-            return math.sqrt((row - self.dest[0]) ** 2 + (col - self.dest[1]) ** 2)
+            return math.sqrt((row - target[0]) ** 2 + (col - target[1]) ** 2)
         
     # Trace the path from source to destination
     def trace_path(self):
         if not self.imported: print("The Path is ")
+        self.last_mark = time.perf_counter()
+        if self.mode == 'HPA*' and self.abstract_path is not None:
+            path = list(self.hierarchy().refine(self.abstract_path))
+        elif self.mode == 'Flow' and self.found_dest:
+            path = self.flow_field().path(self.src)
+        else:
+            path = self.parent_path()
+        self.mark('trace')
+
+        # Print the path
+        if not self.imported:
+            for i, j in path: print("->", (j, i), end=" ")
+            print()
+        else: return path
+
+    # Read the path back from the flat parent buffer
+    def parent_path(self):
         path = []
-        row = self.dest[0]
-        col = self.dest[1]
+        parent = self.state.parent
+        idx = self.dest[0] * self.COL + self.dest[1]
 
-        # Trace the path from destination to source using parent cells
-        while not (self.cell_details[row][col].parent_i == row and self.cell_details[row][col].parent_j == col):
-            path.append((col, row))
-            temp_row = self.cell_details[row][col].parent_i
-            temp_col = self.cell_details[row][col].parent_j
-            row = temp_row
-            col = temp_col
+        # Trace the path from destination to source using the flat parent indices.
+        # Jump point searches link cells a straight or diagonal run apart, so walk each link cell by cell
+        while parent[idx] != idx:
+            row, col = divmod(idx, self.COL)
+            parent_row, parent_col = divmod(parent[idx], self.COL)
+            dr = (parent_row > row) - (parent_row < row)
+            dc = (parent_col > col) - (parent_col < col)
+            while row != parent_row or col != parent_col:
+                path.append((row, col))
+                row += dr
+                col += dc
+            idx = parent[idx]
 
         # Add the source cell to the path
-        path.append((col, row))
+        path.append(divmod(idx, self.COL))
         # Reverse the path to get the path from source to destination
         path.reverse()
-
-        # Print the path
-        if not self.imported:
-            for i in path: print("->", i, end=" ")
-            print()
-        else: return [(j, i) for i, j in path]
+        return path
     
+    # A* over single cells, with moves costed by neighbors.step_cost (looked up in the neighbour mask table).
+    # f = g + weight * h; weight > 1 is Weighted A*, whose paths cost at most
+    # weight times the optimum. With batch > 0 it pauses every batch expansions to yield the lists of
+    # (row, col) cells expanded and queued since the previous pause; with batch=0 it never pauses.
+    # Either way it returns whether the destination was found
+    def search_cells(self, src_idx, opened, closed, batch=0):
+        g, parent, stamp, grid = self.state.g, self.state.parent, self.state.stamp, self.grid
+        dest_idx = self.dest[0] * self.COL + self.dest[1]
+        weight = self.weight
+        expanded_cells, queued_cells = [], []
+        found = False
+
+        # Initialize the open list (cells to be visited) with the start cell
+        self.open_list = open_list = self.open_queue()
+        open_list.push(src_idx, 0.0, 0.0)
+
+        # Successors come from the neighbour masks, so only free cells inside the grid are visited
+        masks, table = self.neighbor_masks().masks, self.neighbor_masks().table
+
+        pushes, pops, stale_pops, reopenings, peak_open = 1, 0, 0, 0, 0
+
+         # Main loop of A* search algorithm
+        while len(open_list) > 0:
+            # Pop the cell with the smallest f value from the open list
+            peak_open = max(peak_open, len(open_list))
+            idx = open_list.pop()
+            pops += 1
+
+            # Skip older entries of cells that were expanded already (lazy open lists only), otherwise mark the cell as visited
+            i, j = divmod(idx, self.COL)
+            if stamp[idx] == closed:
+                stale_pops += 1
+                continue
+            stamp[idx] = closed
+            if batch: expanded_cells.append((i, j))
+
+            # With move costs the destination's g is only final once it leaves the open list
+            if idx == dest_idx:
+                found = True
+                break
+
+            for dir_i, dir_j, offset, cost in table[masks[idx]]:
+                # Skip successors that were visited already
+                new_idx = idx + offset
+                if stamp[new_idx] == closed:
+                    continue
+                new_i = i + dir_i
+                new_j = j + dir_j
+                # Calculate the new g value; h is fixed per cell, so a smaller g means a smaller f
+                g_new = g[idx] + cost[grid[i][j] + grid[new_i][new_j]]
+
+                # If the cell is not in the open list or the new f value is smaller
+                if stamp[new_idx] != opened or g[new_idx] > g_new:
+                    h_new = self.calculate_h_value(new_i, new_j)
+                    # Add the cell to the open list, or move it up if it is queued already
+                    if stamp[new_idx] == opened:
+                        reopenings += 1
+                        open_list.decrease(new_idx, g_new + weight * h_new, h_new)
+                    else:
+                        open_list.push(new_idx, g_new + weight * h_new, h_new)
+                    pushes += 1
+                    # Update the cell details
+                    g[new_idx] = g_new
+                    parent[new_idx] = idx
+                    stamp[new_idx] = opened
+                    if batch: queued_cells.append((new_i, new_j))
+
+            if batch and len(expanded_cells) >= batch:
+                yield expanded_cells, queued_cells
+                expanded_cells, queued_cells = [], []
+
+        if self.stats is not None: self.stats.record(pushes, pops, stale_pops, reopenings, pushes - 1, pops - stale_pops, peak_open)
+        if batch: yield expanded_cells, queued_cells
+        return found
+
+    # Bidirectional A* with average potentials (Ikeda et al.; Goldberg and Harrelson): both searches key
+    # cells by g plus half the difference of the distance estimates to dest and to src (the forward search
+    # adds it, the backward one subtracts it), which keeps both consistent and lets each expanded cell's g
+    # be final. best is the cheapest src-dest path seen where the searches touch; a cheaper path would keep
+    # a cell queued on each side with keys summing to less than its cost, so the search stops once the two
+    # smallest keys add up to best. Moves cost the same both ways and the weight does not apply, so the
+    # path is optimal. Each step expands the side with fewer queued cells, and afterwards the backward half
+    # of the path is linked into the forward parent buffer so trace_path works as for A*.
+    # Steps are yielded as in search_cells
+    def search_bidirectional(self, src_idx, opened, closed, batch=0):
+        COL, grid = self.COL, self.grid
+        dest_idx = self.dest[0] * COL + self.dest[1]
+        masks, table = self.neighbor_masks().masks, self.neighbor_masks().table
+        if self.back_state is None or self.back_state.size != self.ROW * self.COL:
+            self.back_state = SearchState(self.ROW * self.COL)
+        back = self.back_state
+        back_opened, back_closed = back.new_generation()
+        back.g[dest_idx] = 0.0
+        back.parent[dest_idx] = dest_idx
+        back.stamp[dest_idx] = back_opened
+
+        # Open list entry for a cell on one side: the key, then (to break ties as A* does) the estimate to
+        # that side's target, so cells nearer the other end come first
+        def entry(g_cell, row, col, forward):
+            to_dest, to_src = self.calculate_h_value(row, col), self.calculate_h_value(row, col, self.src)
+            if forward: return g_cell + (to_dest - to_src) / 2, to_dest, row * COL + col
+            return g_cell + (to_src - to_dest) / 2, to_src, row * COL + col
+
+        # Per side: g, parent, stamp, its opened and closed stamps, open list of entries, and whether it is the forward side
+        sides = ((self.state.g, self.state.parent, self.state.stamp, opened, closed, [entry(0.0, *self.src, True)], True),
+                 (back.g, back.parent, back.stamp, back_opened, back_closed, [entry(0.0, *self.dest, False)], False))
+        best, meet = INF, -1
+        expanded_cells, queued_cells = [], []
+        pushes, pops, stale_pops, reopenings, peak_open = 2, 0, 0, 0, 0
+        while True:
+            # Drop expanded cells from the tops, so each open list starts with its smallest live key
+            for _, _, stamp, _, done, heap, _ in sides:
+                while heap and stamp[heap[0][2]] == done:
+                    heapq.heappop(heap)
+                    stale_pops += 1
+            forward, backward = sides[0][5], sides[1][5]
+            if not forward or not backward or forward[0][0] + backward[0][0] >= best: break
+            peak_open = max(peak_open, len(forward) + len(backward))
+
+            g, parent, stamp, live, done, heap, is_forward = sides[0] if len(forward) <= len(backward) else sides[1]
+            other_g, _, other_stamp, other_live, other_done, _, _ = sides[1] if heap is forward else sides[0]
+            idx = heapq.heappop(heap)[2]
+            pops += 1
+            stamp[idx] = done
+            i, j = divmod(idx, COL)
+            if batch: expanded_cells.append((i, j))
+            for dir_i, dir_j, offset, cost in table[masks[idx]]:
+                new_idx = idx + offset
+                if stamp[new_idx] == done: continue
+                new_i, new_j = i + dir_i, j + dir_j
+                g_new = g[idx] + cost[grid[i][j] + grid[new_i][new_j]]
+                if stamp[new_idx] != live or g[new_idx] > g_new:
+                    if stamp[new_idx] == live: reopenings += 1
+                    g[new_idx] = g_new
+                    parent[new_idx] = idx
+                    stamp[new_idx] = live
+                    heapq.heappush(heap, entry(g_new, new_i, new_j, is_forward))
+                    pushes += 1
+                    if batch: queued_cells.append((new_i, new_j))
+                    # The other side has reached this cell too: a src-dest path through it
+                    if other_stamp[new_idx] in (other_live, other_done) and g_new + other_g[new_idx] < best:
+                        best, meet = g_new + other_g[new_idx], new_idx
+            if batch and len(expanded_cells) >= batch:
+                yield expanded_cells, queued_cells
+                expanded_cells, queued_cells = [], []
+
+        # Point the backward half of the path at the forward half, from the meeting cell to dest
+        if meet != -1:
+            idx = meet
+            while idx != dest_idx:
+                self.state.parent[back.parent[idx]] = idx
+                idx = back.parent[idx]
+        if self.stats is not None: self.stats.record(pushes, pops, stale_pops, reopenings, 2 * pushes, pops, peak_open)
+        if batch: yield expanded_cells, queued_cells
+        return meet != -1
+
+    # Anytime Repairing A* (ARA*, Likhachev et al.): a fast Weighted A* search with the starting weight,
+    # then searches with ever smaller weights that reuse all earlier work (cells improved after being
+    # expanded wait in incons for the next round), until the path is optimal or time_budget runs out.
+    # Every finished round leaves a valid path in the parent buffer, sets self.bound, the factor by which it
+    # may exceed the optimum, and appends both to self.improvements, so a step-wise caller can use each path
+    # while the search goes on (a step is yielded at the end of every round). Steps are yielded as in
+    # search_cells, and the time the caller spends between them does not count against time_budget
+    def search_anytime(self, src_idx, opened, batch=0):
+        g, parent, stamp, grid = self.state.g, self.state.parent, self.state.stamp, self.grid
+        COL = self.COL
+        dest_idx = self.dest[0] * COL + self.dest[1]
+        masks, table = self.neighbor_masks().masks, self.neighbor_masks().table
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        h = {}  # Cell -> heuristic, evaluated once per query
+
+        def f(idx):
+            if idx not in h: h[idx] = self.calculate_h_value(idx // COL, idx % COL)
+            return g[idx] + weight * h[idx]
+
+        # Hand the cells since the last step to the caller, moving the deadline on by however long it kept us
+        def pause():
+            nonlocal expanded_cells, queued_cells, deadline
+            paused = time.perf_counter()
+            yield expanded_cells, queued_cells
+            expanded_cells, queued_cells = [], []
+            if deadline is not None: deadline += time.perf_counter() - paused
+
+        weight = max(self.weight, 1.0)
+        open_cells, incons = {src_idx}, set()
+        expanded_cells, queued_cells = [], []
+        pushes, pops, stale_pops, reopenings, peak_open = 1, 0, 0, 0, 0
+        found = out_of_time = False
+        while not out_of_time:
+            # Each round starts from the open and inconsistent cells, keyed with the new weight
+            open_cells |= incons
+            incons, closed_now = set(), set()
+            heap = [(f(idx), idx) for idx in open_cells]
+            heapq.heapify(heap)
+            while heap:
+                key, idx = heap[0]
+                if idx not in open_cells or key != f(idx):
+                    heapq.heappop(heap)
+                    stale_pops += 1
+                    continue
+                # Done when no open cell can improve on the destination under the current weight
+                if stamp[dest_idx] == opened and g[dest_idx] <= key: break
+                # Once there is a path, an unfinished round is abandoned when the time is up; the path stays valid
+                if found and pops % 256 == 0 and deadline is not None and time.perf_counter() > deadline:
+                    out_of_time = True
+                    break
+                peak_open = max(peak_open, len(heap))
+                heapq.heappop(heap)
+                pops += 1
+                open_cells.discard(idx)
+                closed_now.add(idx)
+                i, j = divmod(idx, COL)
+                if batch: expanded_cells.append((i, j))
+                for dir_i, dir_j, offset, cost in table[masks[idx]]:
+                    new_i, new_j, new_idx = i + dir_i, j + dir_j, idx + offset
+                    g_new = g[idx] + cost[grid[i][j] + grid[new_i][new_j]]
+                    if stamp[new_idx] != opened or g_new < g[new_idx]:
+                        if stamp[new_idx] == opened: reopenings += 1
+                        g[new_idx] = g_new
+                        parent[new_idx] = idx
+                        stamp[new_idx] = opened
+                        if new_idx in closed_now:
+                            incons.add(new_idx)
+                        else:
+                            open_cells.add(new_idx)
+                            heapq.heappush(heap, (f(new_idx), new_idx))
+                            pushes += 1
+                            if batch: queued_cells.append((new_i, new_j))
+                if batch and len(expanded_cells) >= batch: yield from pause()
+
+            if out_of_time or stamp[dest_idx] != opened: break
+            # The optimum is at least the smallest unweighted f of any cell that could still improve the path
+            found = True
+            lowest = min((g[idx] + h[idx] for idx in open_cells | incons), default=INF)
+            self.bound = max(1.0, min(weight, g[dest_idx] / lowest)) if lowest > 0 else weight
+            self.improvements.append((self.parent_path(), self.bound))
+            if self.bound <= 1.0 or (deadline is not None and time.perf_counter() > deadline): break
+            weight = max(1.0, weight - self.weight_step)
+            if batch: yield from pause()
+
+        if self.stats is not None: self.stats.record(pushes, pops, stale_pops, reopenings, len(h), pops, peak_open)
+        if batch: yield expanded_cells, queued_cells
+        return found
+
+    # Pass on the steps of a search, leaving the time the caller spends between them out of the timings
+    def timed_steps(self, steps):
+        while True:
+            try: step = next(steps)
+            except StopIteration as done: return done.value
+            paused = time.perf_counter()
+            yield step
+            self.last_mark += time.perf_counter() - paused
+
     # Implement the A* search algorithm
     def a_star_search(self):
+        # With batch=0 the step-wise search never pauses, so the first next() runs it to the end
+        try: next(self.a_star_steps(batch=0))
+        except StopIteration as done: return done.value
+
+    # Step-wise a_star_search for callers that must stay responsive, such as the GUI.
+    # Yields (expanded, queued) lists of cells every batch expansions and finally returns the
+    # same status code as a_star_search, as the value of StopIteration (or of "yield from").
+    # Only the STEPWISE modes are split into steps; the other engines run in a single step
+    def a_star_steps(self, batch=64):
+        self.abstract_path = None
+        self.bound = None
+        self.improvements = []
+        self.stats = SearchStats() if self.collect_stats else None
+        self.last_mark = time.perf_counter()
         # Check if the source and destination are valid
         if not self.is_valid(self.src[0], self.src[1]) or not self.is_valid(self.dest[0], self.dest[1]):
             if not self.imported:
@@ -88,80 +548,66 @@ class AStar:
                 print("Source or the destination is blocked")
                 return
             else: return -2
+        self.mark('checks')
+
+        # Reuse the flat buffers: every stamp from an earlier query is now stale
+        opened, closed = self.new_search_state()
+        g, parent, stamp = self.state.g, self.state.parent, self.state.stamp
+
+        # Initialize the start cell details
+        i = self.src[0]
+        j = self.src[1]
+        src_idx = i * self.COL + j
+        g[src_idx] = 0.0
+        parent[src_idx] = src_idx
+        stamp[src_idx] = opened
 
         # Check if we are already at the destination
         if self.is_destination(self.src[0], self.src[1]):
+            self.found_dest = True
+            self.bound = 1.0
             if not self.imported:
                 print("We are already at the destination")
                 return
             else: return 0
 
-        # Initialize the closed list (visited cells)
-        self.closed_list = [[False for _ in range(self.COL)] for _ in range(self.ROW)]
-        # Initialize the details of each cell
-        self.cell_details = [[Cell() for _ in range(self.COL)] for _ in range(self.ROW)]
+        # Cells in different components can never be joined, so those queries skip the search
+        reachable = self.connectivity().connected(self.src, self.dest)
+        if self.heuristic_type == 'ALT': self.landmarks().refresh()
+        self.mark('setup')
 
-        # Initialize the start cell details
-        i = self.src[0]
-        j = self.src[1]
-        self.cell_details[i][j].f = 0
-        self.cell_details[i][j].g = 0
-        self.cell_details[i][j].h = 0
-        self.cell_details[i][j].parent_i = i
-        self.cell_details[i][j].parent_j = j
+        # Run the selected engine; all of them leave the path in the same flat parent buffer
+        # Jump point search assumes every free cell costs the same and that diagonals may cut corners, so
+        # weighted grids and other corner rules fall back to A*; HPA* clusters also assume corners may be cut
+        if not reachable:
+            self.found_dest = False
+        elif self.mode in ('JPS', 'JPS+') and self.corner_cutting == 'allow' and self.jump_points().uniform():
+            self.found_dest = self.jump_points().search(self.src, self.dest, self.state, opened, closed, self.calculate_h_value, self.stats)
+            self.bound = 1.0
+        elif self.mode == 'HPA*' and self.corner_cutting == 'allow':
+            self.abstract_path = self.hierarchy().find_path(self.src, self.dest, self.stats)
+            self.found_dest = self.abstract_path is not None
+        elif self.mode == 'Flow':
+            field = yield from self.timed_steps(self.flow_steps(batch))
+            self.found_dest = field.next[src_idx] != -1
+            self.bound = 1.0
+        elif self.mode == 'Bidirectional':
+            self.found_dest = yield from self.timed_steps(self.search_bidirectional(src_idx, opened, closed, batch))
+            self.bound = 1.0
+        elif self.mode == 'ARA*':
+            self.found_dest = yield from self.timed_steps(self.search_anytime(src_idx, opened, batch))
+        else:
+            self.found_dest = yield from self.timed_steps(self.search_cells(src_idx, opened, closed, batch))
+            self.bound = max(1.0, float(self.weight))
+        self.mark('search')
 
-        # Initialize the open list (cells to be visited) with the start cell
-        heapq.heappush(self.open_list, (0.0, i, j))
-
-         # Main loop of A* search algorithm
-        while len(self.open_list) > 0:
-            # Pop the cell with the smallest f value from the open list
-            p = heapq.heappop(self.open_list)
-
-            # Mark the cell as visited
-            i, j = p[1], p[2]
-            self.closed_list[i][j] = True
-
-            # For each direction, check the successors
-            if self.heuristic_type == 'Manhattan':
-                directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-            else:
-                directions = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
-            for dir in directions:
-                new_i = i + dir[0]
-                new_j = j + dir[1]
-
-                 # If the successor is valid, unblocked, and not visited
-                if self.is_valid(new_i, new_j) and self.is_unblocked(new_i, new_j) and not self.closed_list[new_i][new_j]:
-                    # If the successor is the destination
-                    if self.is_destination(new_i, new_j):
-                        # Set the parent of the destination cell
-                        self.cell_details[new_i][new_j].parent_i = i
-                        self.cell_details[new_i][new_j].parent_j = j
-                        if not self.imported:
-                            print("The destination cell is found")
-                            # Trace and print the path from source to destination
-                            self.trace_path()
-                            self.found_dest = True
-                            return
-                        else:
-                            return 0
-                    else:
-                        # Calculate the new f, g, and h values
-                        g_new = self.cell_details[i][j].g + 1.0
-                        h_new = self.calculate_h_value(new_i, new_j)
-                        f_new = g_new + h_new
-
-                        # If the cell is not in the open list or the new f value is smaller
-                        if self.cell_details[new_i][new_j].f == float('inf') or self.cell_details[new_i][new_j].f > f_new:
-                            # Add the cell to the open list
-                            heapq.heappush(self.open_list, (f_new, new_i, new_j))
-                            # Update the cell details
-                            self.cell_details[new_i][new_j].f = f_new
-                            self.cell_details[new_i][new_j].g = g_new
-                            self.cell_details[new_i][new_j].h = h_new
-                            self.cell_details[new_i][new_j].parent_i = i
-                            self.cell_details[new_i][new_j].parent_j = j
+        if self.found_dest:
+            if not self.imported:
+                print("The destination cell is found")
+                # Trace and print the path from source to destination
+                self.trace_path()
+                return
+            else: return 0
 
         # If the destination is not found after visiting all cells
         if not self.found_dest:
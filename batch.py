@@ -0,0 +1,67 @@
+from multiprocessing import Pool, shared_memory
+from astar import AStar
+from neighbors import check_costs
+
+# A grid copied once into a named shared-memory block (one byte per cell) that worker processes attach to
+class SharedGrid:
+    def __init__(self, grid):
+        check_costs(grid)
+        self.rows = len(grid)
+        self.cols = len(grid[0])
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, self.rows * self.cols))
+        for r, row in enumerate(grid):
+            self.shm.buf[r * self.cols:(r + 1) * self.cols] = bytes(row)
+        self.name = self.shm.name
+
+    def __enter__(self): return self
+
+    def __exit__(self, *exc): self.close()
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+# Row-indexable view over a flat buffer, so AStar can search it without copying into lists
+def grid_view(buf, rows, cols): return [buf[r * cols:(r + 1) * cols] for r in range(rows)]
+
+
+# Per-process state: the attached block and one AStar whose search buffers are reused by every task
+_worker = {}
+
+def _init_worker(name, rows, cols, heuristic_type):
+    shm = shared_memory.SharedMemory(name=name)
+    _worker['shm'] = shm
+    _worker['astar'] = AStar(grid_view(shm.buf, rows, cols), [0, 0], [0, 0], heuristic_type=heuristic_type, imported=True)
+
+def _solve(task):
+    index, src, dest = task
+    astar = _worker['astar']
+    astar.set_query(list(src), list(dest))
+    status = astar.a_star_search()
+    return index, status, astar.trace_path() if status == 0 else None
+
+
+# Solve many (src, dest) pairs on one grid across a pool of processes.
+# Yields (index, status, path) as results complete; status follows the a_star_search contract
+# (0 found, -1 invalid, -2 blocked, -3 unreachable) and path is the trace_path list or None.
+def solve_many(grid, pairs, heuristic_type='Euclidean', processes=None, chunksize=16):
+    with SharedGrid(grid) as shared:
+        with Pool(processes, initializer=_init_worker, initargs=(shared.name, shared.rows, shared.cols, heuristic_type)) as pool:
+            tasks = ((i, tuple(src), tuple(dest)) for i, (src, dest) in enumerate(pairs))
+            for result in pool.imap_unordered(_solve, tasks, chunksize):
+                yield result
+
+
+def main():
+    import random
+    random.seed(0)
+    grid = [[0 if random.random() < 0.25 else 1 for _ in range(200)] for _ in range(200)]
+    pairs = [((random.randrange(200), random.randrange(200)), (random.randrange(200), random.randrange(200))) for _ in range(1000)]
+    counts = {}
+    for index, status, path in solve_many(grid, pairs):
+        counts[status] = counts.get(status, 0) + 1
+    print("Solved", len(pairs), "queries:", counts)
+
+if __name__ == "__main__":
+    main()
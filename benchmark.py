@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from astar import AStar
+from connectivity import ConnectivityIndex
+from mapio import load_map, read_scen
+
+HEURISTICS = ['Euclidean', 'Manhattan', 'Diagonal', 'ALT']
+
+# Perfect maze carved by an iterative depth-first backtracker; walls on even rows/columns
+def make_maze(size, rng):
+    grid = [[0] * size for _ in range(size)]
+    stack = [(1, 1)]
+    grid[1][1] = 1
+    while stack:
+        row, col = stack[-1]
+        options = [(dr, dc) for dr, dc in ((0, 2), (0, -2), (2, 0), (-2, 0))
+                   if 0 < row + dr < size - 1 and 0 < col + dc < size - 1 and grid[row + dr][col + dc] == 0]
+        if not options:
+            stack.pop()
+            continue
+        dr, dc = rng.choice(options)
+        grid[row + dr // 2][col + dc // 2] = 1
+        grid[row + dr][col + dc] = 1
+        stack.append((row + dr, col + dc))
+    return grid
+
+# Uniformly scattered single-cell obstacles
+def make_random(size, rng, density=0.3): return [[0 if rng.random() < density else 1 for _ in range(size)] for _ in range(size)]
+
+# Mostly empty field with a sprinkling of obstacles
+def make_open(size, rng): return make_random(size, rng, density=0.02)
+
+MAPS = {'maze': make_maze, 'random': make_random, 'open': make_open}
+
+# Query pairs drawn from the largest 4-connected component, so every heuristic can solve all of them
+def pick_pairs(grid, count, rng):
+    index = ConnectivityIndex(grid, diagonal=False)
+    if not index.sizes: return []
+    largest = max(index.sizes, key=index.sizes.get)
+    cells = [divmod(i, index.COL) for i, label in enumerate(index.labels) if label == largest]
+    return [(list(rng.choice(cells)), list(rng.choice(cells))) for _ in range(count)]
+
+# Solve every pair with one AStar (as a long-lived caller would) and collect timings and search counters
+def run_case(grid, pairs, heuristic, mode, queue='heap'):
+    astar = AStar(grid, pairs[0][0], pairs[0][1], heuristic_type=heuristic, imported=True, mode=mode, collect_stats=True, queue=queue)
+    start = time.perf_counter()
+    astar.connectivity()
+    if heuristic == 'ALT': astar.landmarks().refresh()
+    setup = time.perf_counter() - start
+
+    times, expanded, peak_open, lengths = [], [], [], []
+    for src, dest in pairs:
+        astar.set_query(src, dest)
+        start = time.perf_counter()
+        status = astar.a_star_search()
+        times.append(time.perf_counter() - start)
+        expanded.append(astar.stats.expanded if astar.stats else 0)
+        peak_open.append(astar.stats.peak_open if astar.stats else 0)
+        lengths.append(len(astar.trace_path()) if status == 0 else 0)
+
+    # Peak memory is measured on a separate fresh run, as tracing distorts the timings
+    tracemalloc.start()
+    astar = AStar(grid, pairs[0][0], pairs[0][1], heuristic_type=heuristic, imported=True, mode=mode, queue=queue)
+    for src, dest in pairs:
+        astar.set_query(src, dest)
+        astar.a_star_search()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'setup_s': setup, 'time_total_s': sum(times), 'time_median_s': statistics.median(times), 'time_max_s': max(times),
+            'expanded_mean': statistics.mean(expanded), 'peak_open_max': max(peak_open), 'path_length_mean': statistics.mean(lengths),
+            'peak_memory_kb': peak_memory / 1024}
+
+def run(sizes, maps, heuristics, modes, queries, seed, queue='heap'):
+    results = []
+    for kind in maps:
+        for size in sizes:
+            rng = random.Random(f"{seed}-{kind}-{size}")
+            grid = MAPS[kind](size, rng)
+            pairs = pick_pairs(grid, queries, rng)
+            if pairs: results += run_cases(kind, grid, pairs, heuristics, modes, queue)
+    return results
+
+# Every mode and heuristic on one grid and query set
+def run_cases(kind, grid, pairs, heuristics, modes, queue='heap'):
+    results = []
+    for mode in modes:
+        for heuristic in heuristics:
+            record = {'map': kind, 'size': len(grid), 'mode': mode, 'heuristic': heuristic, 'queue': queue, 'queries': len(pairs)}
+            record.update(run_case(grid, pairs, heuristic, mode, queue))
+            results.append(record)
+            print(f"{kind:>6} {len(grid):>5} {mode:>13} {heuristic:>9}  median {record['time_median_s'] * 1000:9.2f} ms"
+                  f"  expanded {record['expanded_mean']:10.0f}  peak open {record['peak_open_max']:8}  peak mem {record['peak_memory_kb']:9.0f} KB")
+    return results
+
+# Queries from MovingAI .scen files, spread evenly over their difficulty buckets.
+# Each scenario's map is looked up next to the .scen file
+def run_scenarios(scen_paths, heuristics, modes, queries, queue='heap'):
+    results = []
+    for scen in scen_paths:
+        entries = read_scen(scen)
+        if not entries: continue
+        grid = load_map(os.path.join(os.path.dirname(scen), os.path.basename(entries[0][1])))
+        pairs = [(src, dest) for _, _, src, dest, _ in entries[::max(1, len(entries) // queries)][:queries]]
+        results += run_cases(os.path.splitext(os.path.basename(scen))[0], grid, pairs, heuristics, modes, queue)
+    return results
+
+# Print how each case moved relative to the same case (queue included) in an earlier results file;
+# files written before the queue option ran every case on the heap
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['map'], r['size'], r['mode'], r['heuristic'], r.get('queue', 'heap')): r for r in json.load(f)['results']}
+    print("\nChange against", baseline_path)
+    for r in results:
+        old = baseline.get((r['map'], r['size'], r['mode'], r['heuristic'], r['queue']))
+        if old is None: continue
+        ratio = lambda key: r[key] / old[key] if old[key] else float('nan')
+        print(f"{r['map']:>6} {r['size']:>5} {r['mode']:>13} {r['heuristic']:>9} {r['queue']:>7}  time x{ratio('time_median_s'):.2f}"
+              f"  expanded x{ratio('expanded_mean'):.2f}  memory x{ratio('peak_memory_kb'):.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the A* search engine on generated grids")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[64, 128, 256])
+    parser.add_argument('--maps', nargs='+', choices=list(MAPS), default=list(MAPS))
+    parser.add_argument('--heuristics', nargs='+', choices=HEURISTICS, default=HEURISTICS)
+    parser.add_argument('--modes', nargs='+', choices=['A*', 'Bidirectional', 'ARA*', 'JPS', 'JPS+', 'HPA*', 'Flow'], default=['A*'])
+    parser.add_argument('--queue', choices=['heap', 'indexed', 'bucket'], default='heap', help="open list used by A*")
+    parser.add_argument('--queries', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scen', nargs='+', default=[], help="also run the queries of these MovingAI .scen files")
+    parser.add_argument('--out', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="JSON file from an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.maps, args.heuristics, args.modes, args.queries, args.seed, args.queue)
+    results += run_scenarios(args.scen, args.heuristics, args.modes, args.queries, args.queue)
+    if args.out:
+        meta = {'seed': args.seed, 'queries': args.queries, 'queue': args.queue, 'python': platform.python_version(), 'platform': platform.platform(),
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        with open(args.out, 'w') as f:
+            json.dump({'meta': meta, 'results': results}, f, indent=2)
+    if args.compare: compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,9 @@
 import pygame # type: ignore
 import colors
+from text_cache import render, REGULAR_FONT
 
 class Button:
     def __init__(self, screen, loc, width, name, func, text_color = colors.BLACK, button_color = colors.WHITE, button_img = None, fixed_size = None, tiny = False, hover = "highlight"):
-        self.regular_font = pygame.font.Font(".\\fonts\\basic_types\\Roboto-Medium.ttf", 16)
-        self.tiny_font = pygame.font.Font(".\\fonts\\basic_types\\Roboto-Medium.ttf", 8)
         self.screen = screen
         self.location = loc
         self.width = width
@@ -14,12 +13,9 @@ class Button:
         self.hover = hover
         self.neg = False
         self.back_color = colors.update_brightness(button_color, -min(50, min(button_color)))
-        if not tiny:
-            self.name = self.regular_font.render(name, False, text_color)
-            self.name_negative = self.regular_font.render(name, False, colors.negative(text_color))
-        else:
-            self.name = self.tiny_font.render(name, False, text_color)
-            self.name_negative = self.tiny_font.render(name, False, colors.negative(text_color))
+        size = 8 if tiny else 16
+        self.name = render(REGULAR_FONT, size, name, text_color, False)
+        self.name_negative = render(REGULAR_FONT, size, name, colors.negative(text_color), False)
         self.name_rect = self.name.get_rect()
 
         if fixed_size:
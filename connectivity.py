@@ -0,0 +1,179 @@
+import re
+from array import array
+from collections import deque
+from neighbors import moves
+_FREE = bytes([0] + [1] * 255)  # Translation table: any non-zero cell value is passable
+_RUN = re.compile(rb'\x01+')
+
+
+# Connected-component labels for the free cells of a grid, using the same moves as AStar.
+# Labels are built run-by-run on load and kept up to date on single-cell edits,
+# so "is dest reachable from src" is a comparison of two labels.
+class ConnectivityIndex:
+    def __init__(self, grid, diagonal=True):
+        self.grid = grid
+        self.ROW = len(grid)
+        self.COL = len(grid[0])
+        self.diagonal = diagonal
+        self.directions = [(dr, dc) for dr, dc, _ in moves(diagonal)]
+        self.labels = array('i', [0]) * (self.ROW * self.COL)  # 0 for walls, component label otherwise
+        self.sizes = {}  # label -> number of cells
+        self.next_label = 1
+        self.build()
+
+    # Label every component in one pass over the horizontal runs of free cells.
+    # Runs touching a run of the previous row are merged with union-find, then each run is filled with a slice.
+    def build(self):
+        parent = []
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        reach = 1 if self.diagonal else 0
+        rows = []
+        previous = []
+        for row in self.grid:
+            runs = []
+            first = 0
+            for match in _RUN.finditer(bytes(row).translate(_FREE)):
+                start, end = match.span()
+                run_id = len(parent)
+                parent.append(run_id)
+                # Runs of the previous row that share a column, or a corner when diagonal moves are allowed.
+                # Both rows are sorted, so the scan of the previous row only ever moves forward
+                while first < len(previous) and previous[first][1] + reach <= start: first += 1
+                k = first
+                while k < len(previous) and previous[k][0] < end + reach:
+                    a, b = find(previous[k][2]), find(run_id)
+                    if a != b: parent[max(a, b)] = min(a, b)
+                    k += 1
+                runs.append((start, end, run_id))
+            rows.append(runs)
+            previous = runs
+
+        self.labels = array('i', [0]) * (self.ROW * self.COL)
+        self.sizes = {}
+        label_of = {}
+        for r, runs in enumerate(rows):
+            for start, end, run_id in runs:
+                root = find(run_id)
+                if root not in label_of: label_of[root] = len(label_of) + 1
+                label = label_of[root]
+                self.labels[r * self.COL + start:r * self.COL + end] = array('i', [label]) * (end - start)
+                self.sizes[label] = self.sizes.get(label, 0) + end - start
+        self.next_label = len(label_of) + 1
+
+    def neighbors(self, idx):
+        row, col = divmod(idx, self.COL)
+        for dr, dc in self.directions:
+            if 0 <= row + dr < self.ROW and 0 <= col + dc < self.COL:
+                yield (row + dr) * self.COL + col + dc
+
+    # Check if two cells are free and in the same component
+    def connected(self, a, b):
+        label = self.labels[a[0] * self.COL + a[1]]
+        return label != 0 and label == self.labels[b[0] * self.COL + b[1]]
+
+    # Bring the labels in line with cells whose value changed in the grid
+    def update_cells(self, cells):
+        for row, col in cells:
+            idx = row * self.COL + col
+            free = self.grid[row][col] != 0
+            if free and self.labels[idx] == 0: self.add_cell(idx)
+            elif not free and self.labels[idx] != 0: self.remove_cell(idx)
+
+    # A wall became free: it joins, and possibly bridges, the components around it
+    def add_cell(self, idx):
+        around = {self.labels[n] for n in self.neighbors(idx)} - {0}
+        if not around:
+            label = self.new_label()
+        else:
+            # Keep the largest label and relabel the smaller components into it
+            label = max(around, key=lambda l: self.sizes[l])
+            for n in self.neighbors(idx):
+                old = self.labels[n]
+                if old != 0 and old != label:
+                    self.relabel(n, old, label)
+        self.labels[idx] = label
+        self.sizes[label] = self.sizes.get(label, 0) + 1
+
+    # A free cell became a wall: its component may split into several
+    def remove_cell(self, idx):
+        label = self.labels[idx]
+        self.labels[idx] = 0
+        self.sizes[label] -= 1
+        if self.sizes[label] == 0: del self.sizes[label]
+        seeds = [n for n in self.neighbors(idx) if self.labels[n] == label]
+        if len(seeds) > 1: self.split(label, seeds)
+
+    # Flood out from every neighbour of the removed cell at once, one cell per search per round.
+    # Searches that meet are merged; a search that runs dry before meeting the others is a new component.
+    # The work done is proportional to the pieces that break off, not to the component that stays.
+    def split(self, label, seeds):
+        group = list(range(len(seeds)))
+
+        def find(x):
+            while group[x] != x:
+                group[x] = group[group[x]]
+                x = group[x]
+            return x
+
+        owner = {}
+        frontiers = {}
+        for search, seed in enumerate(seeds):
+            owner[seed] = search
+            frontiers[search] = deque([seed])
+        live = list(range(len(seeds)))
+        finished = []
+        while len(live) > 1:
+            for search in list(live):
+                if search not in live: continue
+                frontier = frontiers[search]
+                if not frontier:
+                    live.remove(search)
+                    finished.append(search)
+                    if len(live) <= 1: break
+                    continue
+                cell = frontier.popleft()
+                for n in self.neighbors(cell):
+                    if self.labels[n] != label: continue
+                    other = owner.get(n)
+                    if other is None:
+                        owner[n] = search
+                        frontier.append(n)
+                    else:
+                        other = find(other)
+                        if other != search:
+                            group[other] = search
+                            frontier.extend(frontiers.pop(other))
+                            live.remove(other)
+                if len(live) <= 1: break
+
+        for search in finished:
+            new = self.new_label()
+            cells = [cell for cell, s in owner.items() if find(s) == search]
+            for cell in cells: self.labels[cell] = new
+            self.sizes[new] = len(cells)
+            self.sizes[label] -= len(cells)
+
+    def relabel(self, start, old, new):
+        queue = deque([start])
+        self.labels[start] = new
+        count = 1
+        while queue:
+            cell = queue.popleft()
+            for n in self.neighbors(cell):
+                if self.labels[n] == old:
+                    self.labels[n] = new
+                    count += 1
+                    queue.append(n)
+        self.sizes[new] = self.sizes.get(new, 0) + count
+        self.sizes[old] -= count
+        if self.sizes[old] == 0: del self.sizes[old]
+
+    def new_label(self):
+        self.next_label += 1
+        return self.next_label - 1
@@ -0,0 +1,129 @@
+import heapq
+from array import array
+from neighbors import check_costs, move_length, moves, octile, step_cost
+
+INF = float('inf')
+
+# Incremental planner (D* Lite, Koenig & Likhachev) over the same grid and moves as AStar.
+# It searches backwards from the destination and keeps g/rhs between calls, so after
+# update_cells() or move_start() compute_path() only repairs the part of the search the change affected.
+class DStarLite:
+    def __init__(self, grid, src, dest, heuristic_type='Euclidean'):
+        check_costs(grid)
+        self.grid = grid
+        self.ROW = len(grid)
+        self.COL = len(grid[0])
+        self.src = list(src)
+        self.dest = list(dest)
+        self.heuristic_type = heuristic_type
+        self.diagonal = heuristic_type != 'Manhattan'
+        self.directions = [(dr, dc) for dr, dc, _ in moves(self.diagonal)]
+        self.g = array('d', [INF]) * (self.ROW * self.COL)
+        self.rhs = array('d', [INF]) * (self.ROW * self.COL)
+        self.queue = []  # Heap of (k1, k2, index); entries whose key no longer matches queued are stale
+        self.queued = {}  # index -> key it currently has in the queue
+        self.km = 0.0  # Key modifier accumulated by moves of the start cell
+        self.expanded = 0  # Cells expanded by the last compute_path, a measure of how local the repair was
+        if self.is_valid(self.dest[0], self.dest[1]):
+            goal = self.dest[0] * self.COL + self.dest[1]
+            self.rhs[goal] = 0.0
+            self.push(goal)
+
+    # Check if given point is in the grid
+    def is_valid(self, row, col): return 0 <= row < self.ROW and 0 <= col < self.COL
+
+    # check if the given node is unblocked
+    def is_unblocked(self, row, col): return self.grid[row][col] != 0
+
+    # Consistent estimate of the distance from the start cell to a cell
+    def h(self, idx):
+        row, col = divmod(idx, self.COL)
+        return octile(row - self.src[0], col - self.src[1], self.diagonal)
+
+    # Cost of moving between two neighbouring cells as AStar charges it, infinite if either of them is a wall
+    def cost(self, a, b):
+        here, there = self.grid[a // self.COL][a % self.COL], self.grid[b // self.COL][b % self.COL]
+        if here == 0 or there == 0: return INF
+        return step_cost(move_length(a // self.COL - b // self.COL, a % self.COL - b % self.COL), here, there)
+
+    def neighbors(self, idx):
+        row, col = divmod(idx, self.COL)
+        for dr, dc in self.directions:
+            if 0 <= row + dr < self.ROW and 0 <= col + dc < self.COL:
+                yield (row + dr) * self.COL + col + dc
+
+    def calculate_key(self, idx):
+        best = min(self.g[idx], self.rhs[idx])
+        return (best + self.h(idx) + self.km, best)
+
+    def push(self, idx):
+        key = self.calculate_key(idx)
+        self.queued[idx] = key
+        heapq.heappush(self.queue, (key[0], key[1], idx))
+
+    # Recompute rhs of a cell from its successors and put it in the queue if it became inconsistent
+    def update_vertex(self, idx):
+        if idx != self.dest[0] * self.COL + self.dest[1]:
+            self.rhs[idx] = min((self.cost(idx, n) + self.g[n] for n in self.neighbors(idx)), default=INF)
+        self.queued.pop(idx, None)
+        if self.g[idx] != self.rhs[idx]: self.push(idx)
+
+    def compute_shortest_path(self):
+        g, rhs, queue, queued = self.g, self.rhs, self.queue, self.queued
+        start = self.src[0] * self.COL + self.src[1]
+        self.expanded = 0
+        while queue:
+            k1, k2, idx = queue[0]
+            if queued.get(idx) != (k1, k2):
+                heapq.heappop(queue)
+                continue
+            if (k1, k2) >= self.calculate_key(start) and rhs[start] == g[start]: break
+            heapq.heappop(queue)
+            del queued[idx]
+            self.expanded += 1
+            new_key = self.calculate_key(idx)
+            if (k1, k2) < new_key:
+                self.push(idx)
+            elif g[idx] > rhs[idx]:
+                g[idx] = rhs[idx]
+                for n in self.neighbors(idx): self.update_vertex(n)
+            else:
+                g[idx] = INF
+                self.update_vertex(idx)
+                for n in self.neighbors(idx): self.update_vertex(n)
+
+    # Report cells whose value changed in the grid; the next compute_path repairs around them
+    def update_cells(self, cells):
+        check_costs(self.grid, [(row, col) for row, col in cells if self.is_valid(row, col)])
+        touched = set()
+        for row, col in cells:
+            if not self.is_valid(row, col): continue
+            idx = row * self.COL + col
+            touched.add(idx)
+            touched.update(self.neighbors(idx))
+        for idx in touched: self.update_vertex(idx)
+
+    # Move the start cell without discarding the search
+    def move_start(self, start):
+        if list(start) == self.src: return
+        if self.is_valid(start[0], start[1]) and self.is_valid(self.src[0], self.src[1]):
+            self.km += self.h(start[0] * self.COL + start[1])
+        self.src = list(start)
+
+    # Bring the search up to date; returns the same status codes as AStar.a_star_search
+    def compute_path(self):
+        if not self.is_valid(self.src[0], self.src[1]) or not self.is_valid(self.dest[0], self.dest[1]): return -1
+        if not self.is_unblocked(self.src[0], self.src[1]) or not self.is_unblocked(self.dest[0], self.dest[1]): return -2
+        self.compute_shortest_path()
+        return 0 if self.g[self.src[0] * self.COL + self.src[1]] < INF else -3
+
+    # Follow the cheapest successor from the start to the destination
+    def trace_path(self):
+        idx = self.src[0] * self.COL + self.src[1]
+        goal = self.dest[0] * self.COL + self.dest[1]
+        path = [divmod(idx, self.COL)]
+        while idx != goal:
+            idx = min(self.neighbors(idx), key=lambda n: self.cost(idx, n) + self.g[n])
+            if self.g[idx] == INF or len(path) > self.ROW * self.COL: return None
+            path.append(divmod(idx, self.COL))
+        return path
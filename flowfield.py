@@ -0,0 +1,75 @@
+import heapq
+from array import array
+from neighbors import NeighborMasks
+
+INF = float('inf')
+
+
+# Reverse distance field towards one destination, over the same grid, moves and costs as AStar.
+# One Dijkstra pass from dest gives every cell its distance and the neighbour to step to next, so any
+# number of sources heading for the same dest are answered by following the field in O(path length).
+# Move costs and corner rules are symmetric, so distances from dest are also distances to it.
+class FlowField:
+    def __init__(self, grid, dest, diagonal=True, neighbors=None, build=True):
+        self.grid = grid
+        self.ROW = len(grid)
+        self.COL = len(grid[0])
+        self.dest = list(dest)
+        self.diagonal = diagonal
+        self.neighbors = neighbors or NeighborMasks(grid, diagonal)  # Masks to share with the caller, if it has them
+        self.dist = array('d', [INF]) * (self.ROW * self.COL)  # Cost from each cell to dest
+        self.next = array('i', [-1]) * (self.ROW * self.COL)  # Flat index of the next cell towards dest
+        self.settled = 0  # Cells reached by the wavefront
+        self.farthest = 0.0  # Largest finite distance, that of the last cell settled
+        if build: self.build()
+
+    def build(self):
+        for _ in self.build_steps(): pass
+
+    # The wavefront reads cell values from one flat copy of the grid, so a move needs no row lookups.
+    # With batch > 0 it pauses every batch settled cells to yield the lists of (row, col) cells settled and
+    # reached since the previous pause, as AStar.search_cells does; with batch=0 it never pauses
+    def build_steps(self, batch=0):
+        ROW, COL, grid, dist, step = self.ROW, self.COL, self.grid, self.dist, self.next
+        masks, table = self.neighbors.masks, self.neighbors.table
+        goal = self.dest[0] * COL + self.dest[1]
+        if not (0 <= self.dest[0] < ROW and 0 <= self.dest[1] < COL) or grid[self.dest[0]][self.dest[1]] == 0: return
+        values = b''.join(bytes(row) for row in grid)
+        dist[goal] = 0.0
+        step[goal] = goal
+        heap = [(0.0, goal)]
+        heappop, heappush = heapq.heappop, heapq.heappush
+        settled, settled_cells, reached_cells = 0, [], []
+        while heap:
+            d, idx = heappop(heap)
+            if d > dist[idx]: continue
+            settled += 1
+            here = values[idx]
+            for _, _, offset, cost in table[masks[idx]]:
+                n = idx + offset
+                nd = d + cost[here + values[n]]
+                if nd < dist[n]:
+                    dist[n] = nd
+                    step[n] = idx
+                    heappush(heap, (nd, n))
+                    if batch: reached_cells.append(divmod(n, COL))
+            if batch:
+                settled_cells.append(divmod(idx, COL))
+                if len(settled_cells) >= batch:
+                    yield settled_cells, reached_cells
+                    settled_cells, reached_cells = [], []
+        self.settled = settled
+        self.farthest = d
+        if batch: yield settled_cells, reached_cells
+
+    def distance(self, cell): return self.dist[cell[0] * self.COL + cell[1]]
+
+    # Path from src to dest as (row, col) cells, or None if dest cannot be reached from src
+    def path(self, src):
+        idx = src[0] * self.COL + src[1]
+        if self.next[idx] == -1: return None
+        path = [divmod(idx, self.COL)]
+        while self.next[idx] != idx:
+            idx = self.next[idx]
+            path.append(divmod(idx, self.COL))
+        return path
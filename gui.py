@@ -1,55 +1,273 @@
-from astar import AStar
+import math
+import sys
+import threading
+import time
+from astar import AStar, STEPWISE
+from path_cache import PathCache
+from dstar_lite import DStarLite
 import colors
 from buttons import Button
+from text_cache import render, HEADING_FONT
+from batch import grid_view
+from mapio import load_map
 import pygame #type: ignore
 
-pygame.init()
+# Grid values drawn by keys 3, 4 and 5: walls are 0, other cells hold the cost of moving through them
+CELL_VALUES = {3: 0, 4: 1, 5: 5}
+MUD_COLOR = colors.update_brightness(colors.ORANGE, -60)
+
+# The board is drawn from an image with one pixel per cell, built through a palette: a cell's palette index
+# is 16 * kind (wall, free, mud) plus its shade level, which darkens cells with their flow-field distance
+KINDS = bytes([0, 16] + [32] * 254)
+PALETTE = [colors.update_brightness(base, -8 * level) for base in (colors.BLACK, colors.WHITE, MUD_COLOR) for level in range(16)]
+
+VIEW = 360  # Largest width and height of the board viewport, in pixels
+ZOOMS = (1 / 16, 1 / 8, 1 / 4, 1 / 2, 1, 2, 3, 4, 6, 8, 12, 16, 24, 32)  # Pixels per cell
+GRID_LINE_ZOOM = 6  # Smallest zoom with grid lines between cells
+ARROW_ZOOM = 8  # Smallest zoom with flow-field ticks
+PAN_KEYS = {pygame.K_LEFT: (0, -1), pygame.K_RIGHT: (0, 1), pygame.K_UP: (-1, 0), pygame.K_DOWN: (1, 0)}
+FRAME_BUDGET = 0.008  # Seconds of searching per frame, leaving the rest of a 60 FPS frame for events and drawing
+ARA_BUDGET = 0.1  # Seconds of searching the ARA* button allows for improving its first path
 
 class GUI:
     def __init__(self, grid, src, dest):
         self.x, self.y = 600, 800
         self.screen = pygame.display.set_mode((self.x, self.y))
         pygame.display.set_caption("A* Pathfinding Algorithm")
-        self.regular_font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
-        self.heading_font = pygame.font.Font(".\\fonts\\AstronBoyWonder.ttf", 36)
         self.grid = grid
-        self.grid_copy = [i for i in grid]
+        self.grid_copy = b''.join(bytes(row) for row in grid)  # One byte per cell, restored by reset
         self.src = src
         self.dest = dest
-        self.cell_size = 12
+        self.cell_size = 12  # Pixels per cell at the default zoom, and the thickness of the board frame
         self.path = []
+        self.path_cells = set()  # The same cells as path, for constant-time lookups while painting
         self.astar = None
+        self.cache = PathCache()  # Results of earlier solves, keyed on the grid version and the query
+        self.live = None  # DStarLite planner that repairs the path while drawing, when live mode is on
+        self.stats = None  # SearchStats of the last solve, shown beside the board
+        self.cached = False  # Whether the last solve was answered from the cache
+        self.bound = None  # Suboptimality bound of the last solve
+        self.steps = None  # Generator of the search being animated, advanced a little every frame
+        self.steps_key = None  # Cache key the running search will be stored under
+        self.job = None  # Background thread preparing the search (or running an engine that has no steps)
+        self.job_result = None  # Result the background thread finished with, None if the search goes on in steps
+        self.improved = 0  # ARA* paths of the running search shown so far
+        # Expansions per frame: enough to flood the whole board in about ten seconds at 60 FPS, few enough
+        # that small searches are still visibly animated; on large boards FRAME_BUDGET cuts a frame short first
+        self.step_batch = max(4, len(grid) * len(grid[0]) // 600)
+        self.open_cells = set()  # Cells queued by the animated search
+        self.closed_cells = set()  # Cells expanded by the animated search
+        self.field = None  # FlowField shaded on the board by the Flow button, until the next solve or edit
+        self.field_max = 1.0  # Largest finite distance in the shown field, for scaling the shading
+        self.shading = None  # Generator shading the field into the cell image a few rows every frame
+        self.flooded = False  # Whether the image holds flow wavefront cells, which only build_board wipes
         self.draw_mode = 3
-        self.board_x = ((self.x // self.cell_size - len(grid[0])) // 2) * self.cell_size
         self.error_message = None
-        self.width = len(grid[0]) * self.cell_size
-        self.height = len(grid) * self.cell_size
+        # Viewport onto the board: grids larger than VIEW pixels at the default zoom are panned and zoomed
+        self.width = min(len(grid[0]) * self.cell_size, VIEW)
+        self.height = min(len(grid) * self.cell_size, VIEW)
+        self.board_x = (self.x - self.width) // 2
+        self.view = pygame.Rect(self.board_x, 100, self.width, self.height)
+        self.zoom = self.fit_zoom()  # Pixels per cell
+        self.origin = [0, 0]  # Cell (row, col) shown at the top-left corner of the viewport
+        self.drag = None  # (mouse position, origin) when a drag that pans the board started
+        self.board_dirty = False  # Whether the viewport must be redrawn from the cell image
         self.buttons = [
-            Button(self.screen, (175, self.y // 2 + 150), 2, "Euclidian", self.euclidian_search, colors.BLACK, colors.update_brightness(colors.SKY_BLUE, 150), fixed_size=(100, 25)),
-            Button(self.screen, (175, self.y // 2 + 185), 2, "Mannhatan", self.mannhatan_search, colors.BLACK, colors.update_brightness(colors.SKY_BLUE, 150), fixed_size=(100, 25)),
-            Button(self.screen, (175, self.y // 2 + 250), 2, "Clear", self.clear, colors.BLACK, colors.update_brightness(colors.DARK_NAVY_BLUE, 150), fixed_size=(100, 25)),
-            Button(self.screen, (175, self.y // 2 + 285), 2, "Reset Board", self.reset, colors.BLACK, colors.update_brightness(colors.DARK_NAVY_BLUE, 150), fixed_size=(100, 25))
+            Button(self.screen, (125, self.y // 2 + 150), 2, "Euclidian", self.euclidian_search, colors.BLACK, colors.update_brightness(colors.SKY_BLUE, 150), fixed_size=(90, 25)),
+            Button(self.screen, (125, self.y // 2 + 180), 2, "Mannhatan", self.mannhatan_search, colors.BLACK, colors.update_brightness(colors.SKY_BLUE, 150), fixed_size=(90, 25)),
+            Button(self.screen, (125, self.y // 2 + 210), 2, "JPS+", self.jps_search, colors.BLACK, colors.update_brightness(colors.SKY_BLUE, 150), fixed_size=(90, 25)),
+            Button(self.screen, (125, self.y // 2 + 240), 2, "ALT", self.alt_search, colors.BLACK, colors.update_brightness(colors.SKY_BLUE, 150), fixed_size=(90, 25)),
+            Button(self.screen, (125, self.y // 2 + 270), 2, "ARA*", self.ara_search, colors.BLACK, colors.update_brightness(colors.SKY_BLUE, 150), fixed_size=(90, 25)),
+            Button(self.screen, (125, self.y // 2 + 300), 2, "Bi-A*", self.bidirectional_search, colors.BLACK, colors.update_brightness(colors.SKY_BLUE, 150), fixed_size=(90, 25)),
+            Button(self.screen, (225, self.y // 2 + 150), 2, "Clear", self.clear, colors.BLACK, colors.update_brightness(colors.DARK_NAVY_BLUE, 150), fixed_size=(90, 25)),
+            Button(self.screen, (225, self.y // 2 + 180), 2, "Reset Board", self.reset, colors.BLACK, colors.update_brightness(colors.DARK_NAVY_BLUE, 150), fixed_size=(90, 25)),
+            Button(self.screen, (225, self.y // 2 + 210), 2, "Live", self.toggle_live, colors.BLACK, colors.update_brightness(colors.DARK_NAVY_BLUE, 150), fixed_size=(90, 25)),
+            Button(self.screen, (225, self.y // 2 + 240), 2, "Flow", self.flow_search, colors.BLACK, colors.update_brightness(colors.DARK_NAVY_BLUE, 150), fixed_size=(90, 25))
         ]
         self.clock = pygame.time.Clock()
         self.last_click = pygame.time.get_ticks()
         self.click_wait = 500
         self.can_click = True
         self.running = True
+        self.dirty = []  # Screen rects changed since the last display update
+        self.hovered = {}  # Button -> whether the mouse was over it when it was last drawn
+        self.background = self.build_background()
+        self.cells = None  # One pixel per cell, scaled into the viewport by blit_board
+        self.build_board()
     
     def euclidian_search(self):
         self.start('Euclidian')
     def mannhatan_search(self):
         self.start('Manhattan')
+    def jps_search(self):
+        self.start('Euclidian', mode='JPS+')
+    def alt_search(self):
+        self.start('ALT')
+    def ara_search(self):
+        self.start('Euclidian', mode='ARA*', weight=3.0, time_budget=ARA_BUDGET)
+    def bidirectional_search(self):
+        self.start('Euclidian', mode='Bidirectional')
+    # Solve through the distance field towards dest, animated like the other solves; once it is built,
+    # finish_search shades the whole field on the board
+    def flow_search(self):
+        self.start('Euclidian', mode='Flow')
     def clear(self):
-        self.path = []
+        self.cancel_search()
+        self.set_path([])
     def reset(self):
-        self.grid = [i for i in self.grid_copy]
+        # A new grid object gets a new AStar and therefore a new version, so cached paths no longer match
+        self.grid = grid_view(memoryview(bytearray(self.grid_copy)), len(self.grid), len(self.grid[0]))
+        self.steps = None
+        self.field = None
+        self.shading = None
+        self.flooded = False
         self.path = []
+        self.path_cells = set()
+        self.open_cells = set()
+        self.closed_cells = set()
+        self.build_board()
+        self.blit_board()
+        if self.live: self.toggle_live(restart=True)
+
+    # Turn live replanning on or off; while on, every edit repairs the path instead of re-solving
+    def toggle_live(self, restart=False):
+        self.cancel_search()
+        self.live = DStarLite(self.grid, self.src, self.dest) if restart or self.live is None else None
+        if self.live: self.replan()
+
+    def replan(self):
+        x = self.live.compute_path()
+        self.show_result(x, self.live.trace_path() if x == 0 else None)
+
+    def start(self, type, mode='A*', weight=1.0, time_budget=None):
+        # Keep one AStar per grid so its search buffers are reused between clicks
+        if self.astar is None or self.astar.grid is not self.grid:
+            self.astar = AStar(self.grid, self.src, self.dest, heuristic_type=type, imported=True, mode=mode, collect_stats=True, weight=weight,
+                               time_budget=time_budget)
+        else:
+            self.astar.set_query(self.src, self.dest, heuristic_type=type, mode=mode, weight=weight, time_budget=time_budget)
+
+        key = PathCache.key(self.astar.version, self.src, self.dest, type, mode)
+        result = self.cache.get(key)
+        self.cancel_search()
+        self.cached = result is not None
+        if result is None:
+            # Building the component labels, masks and landmarks (and running the engines that have no
+            # steps) can take seconds on large maps, so it happens on a thread while the window keeps drawing
+            self.steps_key = key
+            self.job_result = None
+            self.job = threading.Thread(target=self.prepare_search, daemon=True)
+            self.job.start()
+            self.draw_erro_log("Preparing the search...")
+        else:
+            self.finish_search(result)
+
+    # Runs on the background thread; the grid and the AStar are left alone by the frame loop until it ends
+    def prepare_search(self):
+        self.astar.prepare()
+        if self.astar.mode not in STEPWISE:
+            x = self.astar.a_star_search()
+            self.job_result = (x, self.astar.trace_path() if x == 0 else None, self.astar.stats, self.astar.bound)
+
+    # Called by the frame loop once the background thread is done: finish, or solve the rest step by step
+    def end_job(self):
+        self.job = None
+        self.draw_erro_log(self.error_message)
+        if self.job_result is not None:
+            self.cache.put(self.steps_key, self.job_result)
+            self.finish_search(self.job_result)
+        else:
+            self.steps = self.astar.a_star_steps(batch=min(self.step_batch, 64))
+            self.improved = 0
 
-    def start(self, type):
-        self.astar = AStar(self.grid, self.src, self.dest, heuristic_type=type, imported=True)
-        x = self.astar.a_star_search()
+    # Run the pending search for up to step_batch expansions or FRAME_BUDGET seconds, whichever comes first,
+    # and paint the cells it expanded and queued
+    def advance_search(self):
+        deadline = time.perf_counter() + FRAME_BUDGET
+        count = 0
+        while self.steps and count < self.step_batch and time.perf_counter() < deadline:
+            try:
+                expanded, queued = next(self.steps)
+                count += len(expanded)
+                if self.astar.mode == 'Flow':
+                    self.paint_wave(queued, expanded)
+                else:
+                    self.open_cells.update(queued)
+                    self.closed_cells.update(expanded)
+                    for cell in queued + expanded: self.paint_cell(*cell)
+                # ARA* shows each path it finds, with its bound, while it goes on improving it
+                if len(self.astar.improvements) > self.improved:
+                    self.improved = len(self.astar.improvements)
+                    path, self.bound = self.astar.improvements[-1]
+                    self.stats = None
+                    self.draw_stats()
+                    self.set_path(path)
+            except StopIteration as done:
+                self.steps = None
+                x = done.value
+                result = (x, self.astar.trace_path() if x == 0 else None, self.astar.stats, self.astar.bound)
+                self.cache.put(self.steps_key, result)
+                self.finish_search(result)
+        self.blit_board()
+
+    def finish_search(self, result):
+        x, path, self.stats, self.bound = result
+        self.draw_stats()
+        if self.astar.mode == 'Flow' and x == 0: self.show_field(self.astar.flow_field())
+        self.show_result(x, path)
+
+    # The flow wavefront floods the whole board and the shading then covers it, so its cells are painted
+    # straight into the image instead of being kept in open_cells and closed_cells
+    def paint_wave(self, queued, expanded):
+        self.flooded = True
+        keep = self.path_cells | {tuple(self.src), tuple(self.dest)}
+        for cells, color in ((queued, colors.update_brightness(colors.YELLOW, 100)), (expanded, colors.update_brightness(colors.PINK, 30))):
+            for i, j in cells:
+                if (i, j) not in keep: self.cells.set_at((j, i), color)
+
+    def show_field(self, field):
+        self.field = field
+        self.field_max = field.farthest or 1.0
+        self.shading = self.shade_steps()
+
+    # Repaint the cell image one row at a time by the shown field, yielding after each row, then the
+    # coloured overlays on that row
+    def shade_steps(self):
+        COL = len(self.grid[0])
+        overlays = {}
+        for i, j in self.path_cells | {tuple(self.src), tuple(self.dest)}: overlays.setdefault(i, []).append(j)
+        for i in range(len(self.grid)):
+            image = pygame.image.frombytes(self.row_indices(i), (COL, 1), 'P')
+            image.set_palette(PALETTE)
+            self.cells.blit(image, (0, i))
+            for j in overlays.get(i, ()):
+                if 0 <= j < COL: self.paint_cell(i, j)
+            yield
+        self.flooded = False
+
+    # Shade rows for up to FRAME_BUDGET seconds
+    def advance_shading(self):
+        deadline = time.perf_counter() + FRAME_BUDGET
+        while self.shading and time.perf_counter() < deadline:
+            try: next(self.shading)
+            except StopIteration: self.shading = None
+        self.board_dirty = True
+
+    # Stop the animated search, if any, and wipe the cells it coloured (or the whole flow field)
+    def cancel_search(self):
+        self.steps = None
+        self.shading = None
+        if self.field is not None or self.flooded:
+            self.field = None
+            self.flooded = False
+            self.build_board()
+            self.blit_board()
+        explored = self.open_cells | self.closed_cells
+        self.open_cells = set()
+        self.closed_cells = set()
+        for i, j in explored: self.redraw_cell(i, j)
+
+    def show_result(self, x, path):
         if x == -3:
             self.error_message = "Failed to find the destination cell"
         elif x == -2:
@@ -58,102 +276,283 @@ class GUI:
             self.error_message = "Source or destination is invalid"
         else:
             self.error_message = None
-            self.path = self.astar.trace_path()
-    
+            self.set_path(path)
+        self.draw_erro_log(self.error_message)
+
+    # Replace the shown path, repainting only the cells that joined or left it
+    def set_path(self, path):
+        old = self.path_cells
+        self.path = path
+        self.path_cells = set(path)
+        for i, j in old ^ self.path_cells: self.redraw_cell(i, j)
+
+    # Nothing is drawn unless something changed: edits, solves and button hovers repaint
+    # their own area and queue its rect, and only those rects are sent to the display
     def run(self):
+        self.draw_scene()
         while self.running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.running = False
+                elif event.type == pygame.VIDEOEXPOSE:
+                    self.draw_scene()
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     if event.button == 1:
                         for i in self.buttons:
-                            if i.collision_check():
+                            if i.collision_check() and self.job is None:
                                 i.function()
-                        
+                        if self.view.collidepoint(event.pos): self.drag = (event.pos, self.origin[:])
+                elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                    self.drag = None
+                elif event.type == pygame.MOUSEMOTION and self.drag:
+                    (x, y), (row, col) = self.drag
+                    self.set_origin(row - (event.pos[1] - y) / self.zoom, col - (event.pos[0] - x) / self.zoom)
+                elif event.type == pygame.MOUSEWHEEL:
+                    self.zoom_at(pygame.mouse.get_pos(), event.y)
+                elif event.type == pygame.KEYDOWN and event.key in PAN_KEYS:
+                    rows, cols = self.visible_span()
+                    dr, dc = PAN_KEYS[event.key]
+                    self.set_origin(self.origin[0] + dr * max(1, rows // 4), self.origin[1] + dc * max(1, cols // 4))
             
-            self.screen.fill(colors.update_brightness(colors.GRAY, 100))
-            self.draw_scene()
             if self.can_click: self.input()
-            self.mouse_input()
-            for i in self.buttons:
-                i.run()
-            if self.error_message:
-                self.draw_erro_log(self.error_message)
+            if self.job is None: self.mouse_input()
+            elif not self.job.is_alive(): self.end_job()
+            if self.steps: self.advance_search()
+            elif self.shading: self.advance_shading()
+            if self.board_dirty: self.blit_board()
+            self.draw_buttons()
             self.cooldown()
-            pygame.display.update()
+            if self.dirty:
+                pygame.display.update(self.dirty)
+                self.dirty = []
             self.clock.tick(60)
 
         pygame.quit()
     
+    # Restore the bottom bar and write the error message on it, if there is one
     def draw_erro_log(self, text):
-        font = pygame.font.Font(None, 36)
-        text_surface = font.render(text, True, colors.update_brightness(colors.RED, 125))
-        text_rect = text_surface.get_rect(center=(self.x // 2, self.y - 25))
-        self.screen.blit(text_surface, text_rect)
+        bar = pygame.Rect(0, self.y - 50, self.x, 50)
+        self.screen.blit(self.background, bar, bar)
+        if text:
+            text_surface = render(None, 36, text, colors.update_brightness(colors.RED, 125))
+            text_rect = text_surface.get_rect(center=(self.x // 2, self.y - 25))
+            self.screen.blit(text_surface, text_rect)
+        self.dirty.append(bar)
 
-    def draw_text(self):
-        heading = self.heading_font.render("A* Pathfinding Algorithm", True, colors.BLACK)
+    def draw_text(self, surface):
+        heading = render(HEADING_FONT, 36, "A* Pathfinding Algorithm", colors.BLACK)
         heading_rect = heading.get_rect(center=(self.x // 2, 50))
-        self.screen.blit(heading, heading_rect)
+        surface.blit(heading, heading_rect)
 
-        pygame.draw.rect(self.screen, colors.LIGHT_GRAY, (self.x // 4 - 75, self.height + 125, self.x // 2 - 100, 250), 0, 15)
-        pygame.draw.rect(self.screen, colors.LIGHT_GRAY, (3 *self.x // 4 - 125, self.height + 125, self.x // 2 - 100, 250), 0, 15)
+        pygame.draw.rect(surface, colors.LIGHT_GRAY, (self.x // 4 - 75, self.height + 125, self.x // 2 - 100, 250), 0, 15)
+        pygame.draw.rect(surface, colors.LIGHT_GRAY, (3 *self.x // 4 - 125, self.height + 125, self.x // 2 - 100, 250), 0, 15)
 
-        solve = self.small_font.render("Click to solve:", True, colors.BLACK)
+        solve = render(None, 24, "Click to solve:", colors.BLACK)
         solve_rect = solve.get_rect(center=(self.x // 4 + 25, self.height + 100 + 50))
-        self.screen.blit(solve, solve_rect)
+        surface.blit(solve, solve_rect)
 
-        guide = self.small_font.render("Right click to draw:", True, colors.BLACK)
+        guide = render(None, 24, "Right click to draw:", colors.BLACK)
         guide_rect = guide.get_rect(center=(3 * self.x // 4 - 25, self.height + 100 + 50))
-        self.screen.blit(guide, guide_rect)
+        surface.blit(guide, guide_rect)
 
-        one = self.small_font.render("1 - Source", True, colors.BLACK)
-        two = self.small_font.render("2 - Destination", True, colors.BLACK)
-        three = self.small_font.render("3 - Wall", True, colors.BLACK)
-        four = self.small_font.render("4 - Empty Space", True, colors.BLACK)
+        one = render(None, 24, "1 - Source", colors.BLACK)
+        two = render(None, 24, "2 - Destination", colors.BLACK)
+        three = render(None, 24, "3 - Wall", colors.BLACK)
+        four = render(None, 24, "4 - Empty Space", colors.BLACK)
+        five = render(None, 24, f"5 - Mud (cost {CELL_VALUES[5]})", colors.BLACK)
         
         one_rect = one.get_rect(topleft=(3 * self.x // 4 - 75, self.height + 100 + 50 + 50))
         two_rect = two.get_rect(topleft=(3 * self.x // 4 - 75, self.height + 100 + 50 + 75))
         three_rect = three.get_rect(topleft=(3 * self.x // 4 - 75, self.height + 100 + 50 + 100))
         four_rect = four.get_rect(topleft=(3 * self.x // 4 - 75, self.height + 100 + 50 + 125))
+        five_rect = five.get_rect(topleft=(3 * self.x // 4 - 75, self.height + 100 + 50 + 150))
 
-        self.screen.blit(one, one_rect)
-        self.screen.blit(two, two_rect)
-        self.screen.blit(three, three_rect)
-        self.screen.blit(four, four_rect)
+        surface.blit(one, one_rect)
+        surface.blit(two, two_rect)
+        surface.blit(three, three_rect)
+        surface.blit(four, four_rect)
+        surface.blit(five, five_rect)
 
-        pygame.draw.rect(self.screen, colors.update_brightness(colors.GREEN, -50), (3 * self.x // 4 - 105, self.height + 200, self.cell_size, self.cell_size))
-        pygame.draw.rect(self.screen, colors.BLACK, (3 * self.x // 4 - 106, self.height + 199, self.cell_size + 2, self.cell_size + 2), 1)
-        pygame.draw.rect(self.screen, colors.RED, (3 * self.x // 4 - 105, self.height + 225, self.cell_size, self.cell_size))
-        pygame.draw.rect(self.screen, colors.BLACK, (3 * self.x // 4 - 106, self.height + 224, self.cell_size + 2, self.cell_size + 2), 1)
-        pygame.draw.rect(self.screen, colors.BLACK, (3 * self.x // 4 - 105, self.height + 250, self.cell_size, self.cell_size))
-        pygame.draw.rect(self.screen, colors.BLACK, (3 * self.x // 4 - 106, self.height + 249, self.cell_size + 2, self.cell_size + 2), 1)
-        pygame.draw.rect(self.screen, colors.WHITE, (3 * self.x // 4 - 105, self.height + 275, self.cell_size, self.cell_size))
-        pygame.draw.rect(self.screen, colors.BLACK, (3 * self.x // 4 - 106, self.height + 274, self.cell_size + 2, self.cell_size + 2), 1)
+        pygame.draw.rect(surface, colors.update_brightness(colors.GREEN, -50), (3 * self.x // 4 - 105, self.height + 200, self.cell_size, self.cell_size))
+        pygame.draw.rect(surface, colors.BLACK, (3 * self.x // 4 - 106, self.height + 199, self.cell_size + 2, self.cell_size + 2), 1)
+        pygame.draw.rect(surface, colors.RED, (3 * self.x // 4 - 105, self.height + 225, self.cell_size, self.cell_size))
+        pygame.draw.rect(surface, colors.BLACK, (3 * self.x // 4 - 106, self.height + 224, self.cell_size + 2, self.cell_size + 2), 1)
+        pygame.draw.rect(surface, colors.BLACK, (3 * self.x // 4 - 105, self.height + 250, self.cell_size, self.cell_size))
+        pygame.draw.rect(surface, colors.BLACK, (3 * self.x // 4 - 106, self.height + 249, self.cell_size + 2, self.cell_size + 2), 1)
+        pygame.draw.rect(surface, colors.WHITE, (3 * self.x // 4 - 105, self.height + 275, self.cell_size, self.cell_size))
+        pygame.draw.rect(surface, colors.BLACK, (3 * self.x // 4 - 106, self.height + 274, self.cell_size + 2, self.cell_size + 2), 1)
+        pygame.draw.rect(surface, MUD_COLOR, (3 * self.x // 4 - 105, self.height + 300, self.cell_size, self.cell_size))
+        pygame.draw.rect(surface, colors.BLACK, (3 * self.x // 4 - 106, self.height + 299, self.cell_size + 2, self.cell_size + 2), 1)
 
+    # Counters and phase timings of the last solve, in the margin left of the board (down to the bottom of its frame)
+    def draw_stats(self):
+        area = pygame.Rect(0, 100, self.board_x - self.cell_size, self.height + self.cell_size)
+        self.screen.blit(self.background, area, area)
+        self.dirty.append(area)
+        lines = []
+        if self.stats:
+            lines = ["Last solve" + (" (cached)" if self.cached else ""),
+                     f"pushes {self.stats.pushes}", f"pops {self.stats.pops}", f"stale {self.stats.stale_pops}",
+                     f"reopened {self.stats.reopenings}", f"h evals {self.stats.heuristic_evaluations}",
+                     f"expanded {self.stats.expanded}", f"peak open {self.stats.peak_open}"]
+        elif self.steps:
+            lines = ["Improving..."]
+        if self.bound is not None: lines.append(f"bound {self.bound:.2f}")
+        if self.stats:
+            lines.append("")
+            lines += [f"{phase} {seconds * 1000:.2f} ms" for phase, seconds in self.stats.timings.items()]
+        # Beside a short board the lines that would run into the panels below are left out
+        for k, line in enumerate(lines[:area.height // 16]):
+            text = render(None, 18, line, colors.BLACK)
+            self.screen.blit(text, (5, 100 + k * 16))
+
+    # Everything that never changes (backdrop, heading, panels, legend and board frame), rendered once
+    def build_background(self):
+        surface = pygame.Surface((self.x, self.y))
+        surface.fill(colors.update_brightness(colors.GRAY, 100))
+        self.draw_text(surface)
+        pygame.draw.rect(surface, colors.GRAY, (0, self.y - 50, self.x, 50))
+        pygame.draw.rect(surface, colors.BLACK, (self.board_x - self.cell_size, 100 - self.cell_size, self.width + 2 * self.cell_size, self.height + 2 * self.cell_size), 11)
+        return surface
+
+    # Paint every cell into the cell image. Walls, free cells and mud (shaded by flow distance) go through
+    # the palette a whole row at a time, each row held as one integer of one byte per cell; only the
+    # coloured overlays are painted cell by cell
+    def build_board(self):
+        ROW, COL = len(self.grid), len(self.grid[0])
+        image = pygame.image.frombytes(b''.join(self.row_indices(i) for i in range(ROW)), (COL, ROW), 'P')
+        image.set_palette(PALETTE)
+        self.cells = image.convert()
+        for i, j in self.path_cells | self.closed_cells | self.open_cells | {tuple(self.src), tuple(self.dest)}:
+            if 0 <= i < ROW and 0 <= j < COL: self.paint_cell(i, j)
+        self.board_dirty = True
+
+    # Palette indices of row i, one byte per cell
+    def row_indices(self, i):
+        COL = len(self.grid[0])
+        index = int.from_bytes(bytes(self.grid[i]).translate(KINDS), 'big')
+        if self.field is not None:
+            index += int.from_bytes(bytes(map(self.shade_level, self.field.dist[i * COL:(i + 1) * COL])), 'big')
+        return index.to_bytes(COL, 'big')
+
+    # Shade level (0 to 15) of a cell at flow-field distance d
+    def shade_level(self, d): return 0 if d == float('inf') else min(15, int(16 * d / self.field_max))
+
+    # Paint one cell into the cell image
+    def paint_cell(self, i, j):
+        if [i, j] == self.src:
+            color = colors.update_brightness(colors.GREEN, -50)
+        elif [i, j] == self.dest:
+            color = colors.RED
+        elif (i, j) in self.path_cells:
+            color = colors.ROYAL_BLUE
+        elif (i, j) in self.closed_cells:
+            color = colors.update_brightness(colors.PINK, 30)
+        elif (i, j) in self.open_cells:
+            color = colors.update_brightness(colors.YELLOW, 100)
+        else:
+            level = self.shade_level(self.field.distance((i, j))) if self.field is not None else 0
+            color = PALETTE[KINDS[self.grid[i][j]] + level]
+        self.cells.set_at((j, i), color)
+
+    # Repaint one cell, redrawing the viewport with the next frame if the cell is in view
+    def redraw_cell(self, i, j):
+        if not (0 <= i < len(self.grid) and 0 <= j < len(self.grid[0])): return
+        self.paint_cell(i, j)
+        rows, cols = self.visible_span()
+        if 0 <= i - self.origin[0] < rows and 0 <= j - self.origin[1] < cols: self.board_dirty = True
+
+    # Draw the visible cells: the part of the cell image in view, scaled to the zoom (nearest neighbour,
+    # so zoomed-out views sample cells instead of blending walls away), then the grid lines and flow
+    # ticks when cells are large enough to show them
+    def blit_board(self):
+        rows, cols = self.visible_span()
+        top, left = self.origin
+        view = self.view
+        self.screen.blit(self.background, view, view)
+        clip = self.screen.get_clip()
+        self.screen.set_clip(view)
+        size = (max(1, round(cols * self.zoom)), max(1, round(rows * self.zoom)))
+        self.screen.blit(pygame.transform.scale(self.cells.subsurface((left, top, cols, rows)), size), view.topleft)
+        if self.zoom >= GRID_LINE_ZOOM:
+            for k in range(cols): self.screen.fill(colors.LIGHT_GRAY, (view.x + k * self.zoom, view.y, 1, size[1]))
+            for k in range(rows): self.screen.fill(colors.LIGHT_GRAY, (view.x, view.y + k * self.zoom, size[0], 1))
+        if self.field is not None and self.zoom >= ARROW_ZOOM:
+            for i in range(top, top + rows):
+                for j in range(left, left + cols): self.paint_arrow(i, j)
+        # Below a pixel per cell, sampling could drop the path and the end cells, so they are drawn over the image
+        if self.zoom < 1:
+            at = lambda i, j: (view.x + (j - left) * self.zoom, view.y + (i - top) * self.zoom)
+            if len(self.path) > 1: pygame.draw.lines(self.screen, colors.ROYAL_BLUE, False, [at(i, j) for i, j in self.path], 2)
+            for (i, j), color in ((self.src, colors.update_brightness(colors.GREEN, -50)), (self.dest, colors.RED)):
+                self.screen.fill(color, pygame.Rect(0, 0, 5, 5).move(at(i, j)).move(-2, -2))
+        self.screen.set_clip(clip)
+        self.dirty.append(view.copy())
+        self.board_dirty = False
+
+    # Short tick from the cell centre towards the neighbour the flow field steps to next
+    def paint_arrow(self, i, j):
+        step = self.field.next[i * self.field.COL + j]
+        if step == -1 or [i, j] == self.dest: return
+        r, c = divmod(step, self.field.COL)
+        x = self.view.x + (j - self.origin[1]) * self.zoom + self.zoom // 2
+        y = self.view.y + (i - self.origin[0]) * self.zoom + self.zoom // 2
+        reach = self.zoom * 2 // 5
+        pygame.draw.line(self.screen, colors.DARK_NAVY_BLUE, (x, y), (x + (c - j) * reach, y + (r - i) * reach))
+
+    # Largest zoom, up to the default cell size, that fits the whole grid in the viewport
+    def fit_zoom(self):
+        fits = [z for z in ZOOMS if z <= self.cell_size and len(self.grid[0]) * z <= VIEW and len(self.grid) * z <= VIEW]
+        return fits[-1] if fits else ZOOMS[0]
+
+    # Rows and columns of cells in view (the last ones may be partly cut off)
+    def visible_span(self):
+        return min(len(self.grid), math.ceil(self.height / self.zoom)), min(len(self.grid[0]), math.ceil(self.width / self.zoom))
+
+    # Scroll so that cell (row, col) is at the top-left corner, keeping the view on the grid
+    def set_origin(self, row, col):
+        rows, cols = self.visible_span()
+        origin = [max(0, min(round(row), len(self.grid) - rows)), max(0, min(round(col), len(self.grid[0]) - cols))]
+        if origin != self.origin:
+            self.origin = origin
+            self.board_dirty = True
+
+    # Step the zoom in (steps > 0) or out, keeping the cell under the mouse where it is; zooming out
+    # stops once the whole grid fits the viewport
+    def zoom_at(self, pos, steps):
+        if not self.view.collidepoint(pos): return
+        level = max(ZOOMS.index(self.fit_zoom()), min(len(ZOOMS) - 1, ZOOMS.index(self.zoom) + steps))
+        x, y = pos[0] - self.view.x, pos[1] - self.view.y
+        row, col = self.origin[0] + y / self.zoom, self.origin[1] + x / self.zoom
+        self.zoom = ZOOMS[level]
+        self.origin = [-1, -1]  # Forces the redraw even if the origin stays the same
+        self.set_origin(row - y / self.zoom, col - x / self.zoom)
+
+    # Cell under a screen position, or None outside the board: constant time at any grid size
+    def cell_at(self, pos):
+        if not self.view.collidepoint(pos): return None
+        i = self.origin[0] + int((pos[1] - self.view.y) / self.zoom)
+        j = self.origin[1] + int((pos[0] - self.view.x) / self.zoom)
+        return (i, j) if i < len(self.grid) and j < len(self.grid[0]) else None
+
+    # Redraw buttons whose hover state changed since they were last drawn
+    def draw_buttons(self, force=False):
+        for button in self.buttons:
+            hover = button.collision_check()
+            if force or self.hovered.get(button) != hover:
+                self.hovered[button] = hover
+                self.screen.blit(self.background, button.box_rect, button.box_rect)
+                button.run()
+                self.dirty.append(button.box_rect)
+
+    # Draw the whole window from the cached layers
     def draw_scene(self):
-        self.draw_text()
-        
-        for i in range(len(self.grid)):
-            for j in range(len(self.grid[0])):
-                color = (255, 255, 255) if self.grid[i][j] == 1 else (0, 0, 0)
-                if [i, j] == self.src:
-                    pygame.draw.rect(self.screen, colors.update_brightness(colors.GREEN, -50), (j * self.cell_size + self.board_x, i * self.cell_size + 100, self.cell_size, self.cell_size))
-                elif [i, j] == self.dest:
-                    pygame.draw.rect(self.screen, colors.RED, (j * self.cell_size + self.board_x, i * self.cell_size + 100, self.cell_size, self.cell_size))
-                elif (i, j) in self.path:
-                    pygame.draw.rect(self.screen, colors.ROYAL_BLUE, (j * self.cell_size + self.board_x, i * self.cell_size + 100, self.cell_size, self.cell_size))
-                else:
-                    pygame.draw.rect(self.screen, color, (j * self.cell_size + self.board_x, i * self.cell_size + 100, self.cell_size, self.cell_size))
-        pygame.draw.rect(self.screen, colors.GRAY, (0, self.y - 50, self.x, 50))
-        
-        # Testing for symmetry
-        for i in range(len(self.grid)):
-            pygame.draw.line(self.screen, colors.LIGHT_GRAY, (i * self.cell_size + self.board_x, 100), (i * self.cell_size + self.board_x, 100 + self.height), 1)
-        for i in range(len(self.grid[0])):
-            pygame.draw.line(self.screen, colors.LIGHT_GRAY, (self.board_x , i * self.cell_size + 100), (self.board_x + self.width, i * self.cell_size + 100), 1)
-        pygame.draw.rect(self.screen, colors.BLACK, (self.board_x - self.cell_size, 100 - self.cell_size, self.width + 2 * self.cell_size, self.height + 2 * self.cell_size), 11)
+        self.screen.blit(self.background, (0, 0))
+        self.blit_board()
+        self.draw_stats()
+        self.draw_buttons(force=True)
+        self.draw_erro_log(self.error_message)
+        self.dirty = [self.screen.get_rect()]
     
     def input(self):
         keys = pygame.key.get_pressed()
@@ -166,6 +565,8 @@ class GUI:
             key = 3
         elif keys[pygame.K_4] or keys[pygame.K_KP4]:
             key = 4
+        elif keys[pygame.K_5] or keys[pygame.K_KP5]:
+            key = 5
         
         if key is not None:
             self.can_click = False
@@ -176,20 +577,35 @@ class GUI:
     def mouse_input(self):
         mouse = pygame.mouse.get_pressed()
         if mouse[2] == 1:
-            mouse_pos = pygame.mouse.get_pos()
-            for i in range(len(self.grid)):
-                for j in range(len(self.grid[0])):
-                    if self.board_x + j * self.cell_size < mouse_pos[0] < self.board_x + (j + 1) * self.cell_size and 100 + i * self.cell_size < mouse_pos[1] < 100 + (i + 1) * self.cell_size:
-                        if self.draw_mode == 1:
-                            self.src = [i, j]
-                        elif self.draw_mode == 2:
-                            self.dest = [i, j]
-                        elif self.draw_mode == 3:
-                            self.grid[i][j] = 0
-                        else:
-                            self.grid[i][j] = 1
+            cell = self.cell_at(pygame.mouse.get_pos())
+            if cell is None: return
+            i, j = cell
+            if self.draw_mode == 1:
+                if self.src != [i, j]:
+                    self.cancel_search()
+                    old, self.src = self.src, [i, j]
+                    self.redraw_cell(*old)
+                    self.redraw_cell(i, j)
+                    if self.live:
+                        self.live.move_start(self.src)
+                        self.replan()
+            elif self.draw_mode == 2:
+                if self.dest != [i, j]:
+                    self.cancel_search()
+                    old, self.dest = self.dest, [i, j]
+                    self.redraw_cell(*old)
+                    self.redraw_cell(i, j)
+                    if self.live: self.toggle_live(restart=True)
+            elif self.grid[i][j] != CELL_VALUES[self.draw_mode]:
+                self.cancel_search()
+                self.grid[i][j] = CELL_VALUES[self.draw_mode]
+                self.redraw_cell(i, j)
+                if self.astar is not None and self.astar.grid is self.grid:
+                    self.astar.update_cells([(i, j)])
+                if self.live:
+                    self.live.update_cells([(i, j)])
+                    self.replan()
 
-    
     def cooldown(self):
         current_time = pygame.time.get_ticks()
         if current_time - self.last_click >= self.click_wait:
@@ -231,5 +647,22 @@ maze = [
 ]
 
 
-x = GUI(maze, [3, 1], [28, 28])
-x.run()
\ No newline at end of file
+# First and last free cells of a grid in row order, found a row at a time, or None if every cell is a wall
+def free_ends(grid):
+    rows = [i for i, row in enumerate(grid) if bytes(row).strip(b'\0')]
+    if not rows: return None
+    first, last = bytes(grid[rows[0]]), bytes(grid[rows[-1]])
+    return [rows[0], len(first) - len(first.lstrip(b'\0'))], [rows[-1], len(last.rstrip(b'\0')) - 1]
+
+
+# Open the sample maze, or the map file given on the command line (a MovingAI .map or a packed grid,
+# edited in a private copy) with the source and destination on its first and last free cells
+if __name__ == "__main__":
+    pygame.init()
+    if len(sys.argv) > 1:
+        grid = load_map(sys.argv[1], writable=True)
+        ends = free_ends(grid)
+        if ends is None: sys.exit(f"{sys.argv[1]}: no free cells to place the source and destination on")
+        GUI(grid, *ends).run()
+    else:
+        GUI(maze, [3, 1], [28, 28]).run()
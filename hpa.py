@@ -0,0 +1,239 @@
+import heapq
+from neighbors import move_length, moves, octile, step_cost
+
+INF = float('inf')
+
+# Hierarchical path-finding (HPA*) over the same grid and moves as AStar.
+# The grid is cut into cluster_size x cluster_size clusters; cells where a path can cross from one
+# cluster to the next become abstract nodes, joined by the distances between them inside each cluster.
+# Queries search that small abstract graph and only refine the chosen path into cells on request.
+# Borders and intra-cluster distances are computed the first time a query needs them (build() does all of
+# them up front) and edits only discard the clusters around the edited cells.
+class HierarchicalGraph:
+    def __init__(self, grid, diagonal=True, cluster_size=16):
+        self.grid = grid
+        self.ROW = len(grid)
+        self.COL = len(grid[0])
+        self.diagonal = diagonal
+        self.directions = [(dr, dc) for dr, dc, _ in moves(diagonal)]
+        self.S = cluster_size
+        self.C_ROWS = -(-self.ROW // cluster_size)
+        self.C_COLS = -(-self.COL // cluster_size)
+        self.borders = {}  # (kind, cr, cc) -> [(a, b)] crossings from cluster (cr, cc) to its neighbour
+        self.edges = {}  # cluster -> (intra, inter): node -> {node: cost} inside, node -> [(node, cost)] across
+
+    def free(self, row, col): return 0 <= row < self.ROW and 0 <= col < self.COL and self.grid[row][col] != 0
+
+    def cluster_of(self, idx): return (idx // self.COL // self.S, idx % self.COL // self.S)
+
+    # Cost of a single move between neighbouring cells, the same as AStar charges
+    def step_cost(self, a, b):
+        (ar, ac), (br, bc) = divmod(a, self.COL), divmod(b, self.COL)
+        return step_cost(move_length(ar - br, ac - bc), self.grid[ar][ac], self.grid[br][bc])
+
+    # Consistent estimate of the cost between two cells
+    def h(self, a, b):
+        return octile(a // self.COL - b // self.COL, a % self.COL - b % self.COL, self.diagonal)
+
+    # Borders are named after the cluster on their north/west side: E and S are shared edges,
+    # SE and SW are the single corners a diagonal move can cross
+    def border_clusters(self, key):
+        kind, cr, cc = key
+        other = {'E': (cr, cc + 1), 'S': (cr + 1, cc), 'SE': (cr + 1, cc + 1), 'SW': (cr + 1, cc - 1)}[kind]
+        return (cr, cc), other
+
+    def incident_borders(self, cr, cc):
+        keys = [('E', cr, cc), ('E', cr, cc - 1), ('S', cr, cc), ('S', cr - 1, cc)]
+        if self.diagonal: keys += [('SE', cr, cc), ('SE', cr - 1, cc - 1), ('SW', cr, cc), ('SW', cr - 1, cc + 1)]
+        return [key for key in keys if all(0 <= r < self.C_ROWS and 0 <= c < self.C_COLS for r, c in self.border_clusters(key))]
+
+    def border(self, key):
+        if key not in self.borders: self.borders[key] = self.compute_border(*key)
+        return self.borders[key]
+
+    # Find the crossings of one border: one per short run of open cell pairs, two for long runs,
+    # plus diagonal squeezes between two walls that no straight crossing can stand in for
+    def compute_border(self, kind, cr, cc):
+        S, COL = self.S, self.COL
+        crossings = []
+        if kind in ('SE', 'SW'):
+            y = (cr + 1) * S
+            if kind == 'SE':
+                x = (cc + 1) * S
+                a, b = (y - 1, x - 1), (y, x)
+            else:
+                x = cc * S
+                a, b = (y - 1, x), (y, x - 1)
+            if self.free(*a) and self.free(*b) and not self.free(a[0], b[1]) and not self.free(b[0], a[1]):
+                crossings.append((a[0] * COL + a[1], b[0] * COL + b[1]))
+            return crossings
+
+        if kind == 'E':
+            line = range(cr * S, min((cr + 1) * S, self.ROW))
+            x = (cc + 1) * S
+            a = lambda k: (k, x - 1)
+            b = lambda k: (k, x)
+        else:
+            line = range(cc * S, min((cc + 1) * S, self.COL))
+            y = (cr + 1) * S
+            a = lambda k: (y - 1, k)
+            b = lambda k: (y, k)
+
+        def add(k): crossings.append((a(k)[0] * COL + a(k)[1], b(k)[0] * COL + b(k)[1]))
+
+        run = []
+        for k in list(line) + [None]:
+            if k is not None and self.free(*a(k)) and self.free(*b(k)):
+                run.append(k)
+                continue
+            if len(run) >= 6:
+                add(run[0])
+                add(run[-1])
+            elif run:
+                add(run[len(run) // 2])
+            run = []
+        if self.diagonal:
+            for k in list(line)[:-1]:
+                if self.free(*a(k)) and self.free(*b(k + 1)) and not self.free(*b(k)) and not self.free(*a(k + 1)):
+                    crossings.append((a(k)[0] * COL + a(k)[1], b(k + 1)[0] * COL + b(k + 1)[1]))
+                if self.free(*a(k + 1)) and self.free(*b(k)) and not self.free(*a(k)) and not self.free(*b(k + 1)):
+                    crossings.append((a(k + 1)[0] * COL + a(k + 1)[1], b(k)[0] * COL + b(k)[1]))
+        return crossings
+
+    # Abstract nodes of a cluster with their intra-cluster distances and the edges that leave it
+    def cluster_edges(self, cluster):
+        if cluster not in self.edges:
+            inter = {}
+            for key in self.incident_borders(*cluster):
+                inside_first = self.border_clusters(key)[0] == cluster
+                for a, b in self.border(key):
+                    u, v = (a, b) if inside_first else (b, a)
+                    inter.setdefault(u, []).append((v, self.step_cost(u, v)))
+            intra = {}
+            graph = self.cluster_graph(cluster) if inter else None
+            for u in inter:
+                dist = self.cluster_search(u, graph)[0]
+                intra[u] = {v: dist[v] for v in inter if v != u and v in dist}
+            self.edges[cluster] = (intra, inter)
+        return self.edges[cluster]
+
+    # Compute every border and intra-cluster distance now instead of on first use
+    def build(self):
+        for cr in range(self.C_ROWS):
+            for cc in range(self.C_COLS):
+                self.cluster_edges((cr, cc))
+
+    # Moves between the free cells of one cluster as cell -> [(neighbour, cost)].
+    # With reverse=True each move is listed from its end, with the cost of the original direction
+    def cluster_graph(self, cluster, reverse=False):
+        r0, c0 = cluster[0] * self.S, cluster[1] * self.S
+        r1, c1 = min(r0 + self.S, self.ROW), min(c0 + self.S, self.COL)
+        COL, grid = self.COL, self.grid
+        graph = {}
+        for row in range(r0, r1):
+            for col in range(c0, c1):
+                if grid[row][col] == 0: continue
+                u = row * COL + col
+                moves = graph[u] = []
+                for dr, dc in self.directions:
+                    nr, nc = row + dr, col + dc
+                    if r0 <= nr < r1 and c0 <= nc < c1 and grid[nr][nc] != 0:
+                        v = nr * COL + nc
+                        moves.append((v, self.step_cost(v, u) if reverse else self.step_cost(u, v)))
+        return graph
+
+    # Dijkstra over a cluster graph from source, stopping early at target if given
+    def cluster_search(self, source, graph, target=None):
+        dist = {source: 0.0}
+        parent = {source: source}
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]: continue
+            if u == target: break
+            for v, cost in graph[u]:
+                nd = d + cost
+                if nd < dist.get(v, INF):
+                    dist[v] = nd
+                    parent[v] = u
+                    heapq.heappush(heap, (nd, v))
+        return dist, parent
+
+    # Search the abstract graph from src to dest; returns the list of abstract cells or None.
+    # Counters of the abstract search are written to stats (an astar.SearchStats) when one is given
+    def find_path(self, src, dest, stats=None):
+        s = src[0] * self.COL + src[1]
+        t = dest[0] * self.COL + dest[1]
+        s_cluster, t_cluster = self.cluster_of(s), self.cluster_of(t)
+
+        # Temporary edges joining src and dest to the abstract nodes of their clusters
+        start_dist = self.cluster_search(s, self.cluster_graph(s_cluster))[0]
+        start_edges = {u: d for u, d in start_dist.items() if u in self.cluster_edges(s_cluster)[1] and u != s}
+        if s_cluster == t_cluster and t in start_dist: start_edges[t] = start_dist[t]
+        goal_dist = self.cluster_search(t, self.cluster_graph(t_cluster, reverse=True))[0]
+        goal_edges = {u: d for u, d in goal_dist.items() if u in self.cluster_edges(t_cluster)[1] and u != t}
+
+        g = {s: 0.0}
+        parent = {s: s}
+        closed = set()
+        heap = [(self.h(s, t), s)]
+        pushes, pops, stale_pops, reopenings, peak_open = 1, 0, 0, 0, 0
+        path = None
+        while heap:
+            peak_open = max(peak_open, len(heap))
+            u = heapq.heappop(heap)[1]
+            pops += 1
+            if u in closed:
+                stale_pops += 1
+                continue
+            closed.add(u)
+            if u == t:
+                path = [u]
+                while parent[u] != u:
+                    u = parent[u]
+                    path.append(u)
+                path.reverse()
+                break
+            intra, inter = self.cluster_edges(self.cluster_of(u))
+            edges = list(intra.get(u, {}).items()) + inter.get(u, [])
+            if u == s: edges += start_edges.items()
+            if u in goal_edges: edges.append((t, goal_edges[u]))
+            for v, cost in edges:
+                g_new = g[u] + cost
+                if v not in closed and g_new < g.get(v, INF):
+                    if v in g: reopenings += 1
+                    g[v] = g_new
+                    parent[v] = u
+                    heapq.heappush(heap, (g_new + self.h(v, t), v))
+                    pushes += 1
+        if stats is not None: stats.record(pushes, pops, stale_pops, reopenings, pushes, len(closed), peak_open)
+        return path
+
+    # Turn an abstract path into (row, col) cells one segment at a time
+    def refine(self, abstract_path):
+        yield divmod(abstract_path[0], self.COL)
+        for u, v in zip(abstract_path, abstract_path[1:]):
+            cluster = self.cluster_of(u)
+            if cluster != self.cluster_of(v):
+                yield divmod(v, self.COL)
+                continue
+            parent = self.cluster_search(u, self.cluster_graph(cluster), target=v)[1]
+            segment = []
+            while v != u:
+                segment.append(divmod(v, self.COL))
+                v = parent[v]
+            yield from reversed(segment)
+
+    # Drop the borders and distances of every cluster an edited cell can affect
+    def update_cells(self, cells):
+        touched = set()
+        for row, col in cells:
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    if 0 <= row + dr < self.ROW and 0 <= col + dc < self.COL:
+                        touched.add(((row + dr) // self.S, (col + dc) // self.S))
+        for cluster in touched:
+            self.edges.pop(cluster, None)
+            for key in self.incident_borders(*cluster):
+                self.borders.pop(key, None)
+                for side in self.border_clusters(key): self.edges.pop(side, None)
@@ -0,0 +1,194 @@
+import heapq
+from array import array
+from neighbors import DIAGONAL as DIAGONAL_MOVES, STRAIGHT as STRAIGHT_MOVES, octile
+
+STRAIGHT = [(dr, dc) for dr, dc, _ in STRAIGHT_MOVES]
+DIAGONAL = [(dr, dc) for dr, dc, _ in DIAGONAL_MOVES]
+
+# Sign of a number, used to recover the direction of travel from a parent to a child
+def sign(x): return (x > 0) - (x < 0)
+
+
+# Jump Point Search over a uniform-cost grid (0 walls, 1 free cells), writing into AStar's flat search buffers.
+# 8-connected searches follow the same move rules as AStar (diagonals may pass between two walls),
+# 4-connected searches are used for Manhattan. With precompute=True (JPS+) the distance from every
+# cell to the next jump point or wall is tabulated per straight direction, so straight jumps cost O(1).
+class JumpPointSearch:
+    def __init__(self, grid, rows, cols, diagonal=True, precompute=False):
+        self.grid = grid
+        self.ROW = rows
+        self.COL = cols
+        self.diagonal = diagonal
+        self.precompute = precompute
+        # Directions that are pure straight scans: all four when diagonal, only along rows otherwise
+        self.table_dirs = STRAIGHT if diagonal else STRAIGHT[:2]
+        self.jump_table = {}  # direction -> steps from a cell to the first jump point, -1 if a wall comes first
+        self.run_table = {}  # direction -> number of free cells starting at a cell
+        self.dirty_rows = set(range(rows)) if precompute else set()
+        self.dirty_cols = set(range(cols)) if precompute and diagonal else set()
+        self.is_uniform = None  # Whether every free cell costs 1, None until checked
+
+    def walkable(self, row, col): return 0 <= row < self.ROW and 0 <= col < self.COL and self.grid[row][col] == 1
+
+    # Check if a cell met while moving straight in (dr, dc) has a forced neighbour
+    def is_forced(self, row, col, dr, dc):
+        walk = self.walkable
+        if self.diagonal:
+            if dc:
+                return (walk(row + 1, col + dc) and not walk(row + 1, col)) or (walk(row - 1, col + dc) and not walk(row - 1, col))
+            return (walk(row + dr, col + 1) and not walk(row, col + 1)) or (walk(row + dr, col - 1) and not walk(row, col - 1))
+        if dc:
+            return (walk(row - 1, col) and not walk(row - 1, col - dc)) or (walk(row + 1, col) and not walk(row + 1, col - dc))
+        return (walk(row, col - 1) and not walk(row - dr, col - 1)) or (walk(row, col + 1) and not walk(row - dr, col + 1))
+
+    # Jumps skip over cells without looking at their cost, so they are only valid when all free cells cost 1
+    def uniform(self):
+        if self.is_uniform is None: self.is_uniform = all(max(row, default=0) <= 1 for row in self.grid)
+        return self.is_uniform
+
+    # Note cells whose value changed; the JPS+ lines that can see them are rebuilt before the next search
+    def update_cells(self, cells):
+        if any(self.grid[row][col] > 1 for row, col in cells): self.is_uniform = False
+        elif self.is_uniform is False: self.is_uniform = None
+        if not self.precompute: return
+        for row, col in cells:
+            self.dirty_rows.update(r for r in (row - 1, row, row + 1) if 0 <= r < self.ROW)
+            if self.diagonal: self.dirty_cols.update(c for c in (col - 1, col, col + 1) if 0 <= c < self.COL)
+
+    # Rebuild the JPS+ tables for every dirty row and column
+    def build_tables(self):
+        size = self.ROW * self.COL
+        for d in self.table_dirs:
+            if d not in self.jump_table:
+                self.jump_table[d] = array('i', [-1]) * size
+                self.run_table[d] = array('i', [0]) * size
+        for row in self.dirty_rows:
+            for d in ((0, 1), (0, -1)):
+                self.build_line(row, 0, d, self.COL)
+        for col in self.dirty_cols:
+            for d in ((1, 0), (-1, 0)):
+                self.build_line(0, col, d, self.ROW)
+        self.dirty_rows.clear()
+        self.dirty_cols.clear()
+
+    # Sweep one row or column against the direction of travel, so each cell reuses the answer of the next one
+    def build_line(self, row, col, d, length):
+        jump, run = self.jump_table[d], self.run_table[d]
+        dr, dc = d
+        forward = dr + dc > 0
+        next_jump, next_run = -1, 0
+        for k in range(length - 1, -1, -1) if forward else range(length):
+            r, c = (k, col) if dr else (row, k)
+            idx = r * self.COL + c
+            if not self.walkable(r, c):
+                next_jump, next_run = -1, 0
+            elif self.is_forced(r, c, dr, dc):
+                next_jump, next_run = 0, next_run + 1
+            else:
+                next_jump, next_run = (next_jump + 1 if next_jump >= 0 else -1), next_run + 1
+            jump[idx] = next_jump
+            run[idx] = next_run
+
+    # Move straight from (row, col) until a jump point, the destination or a wall.
+    # Vertical 4-connected jumps branch sideways at every step, so they have no table and are always scanned
+    def jump_straight(self, row, col, dr, dc, dest):
+        if self.precompute and (dr, dc) in self.jump_table:
+            if not (0 <= row < self.ROW and 0 <= col < self.COL): return None
+            idx = row * self.COL + col
+            free = self.run_table[(dr, dc)][idx]
+            if free == 0: return None
+            steps = self.jump_table[(dr, dc)][idx]
+            limit = steps if steps >= 0 else free - 1
+            to_dest = (dest[1] - col) * dc if dc else (dest[0] - row) * dr
+            if (dest[0] == row if dc else dest[1] == col) and 0 <= to_dest <= limit: return dest
+            return (row + steps * dr, col + steps * dc) if steps >= 0 else None
+        while True:
+            if not self.walkable(row, col): return None
+            if row == dest[0] and col == dest[1]: return row, col
+            if self.is_forced(row, col, dr, dc): return row, col
+            # Moving vertically on a 4-connected grid, a horizontal branch to a jump point makes this one
+            if not self.diagonal and dr and (self.jump_straight(row, col + 1, 0, 1, dest) or self.jump_straight(row, col - 1, 0, -1, dest)):
+                return row, col
+            row += dr
+            col += dc
+
+    # Move diagonally until a jump point, the destination or a wall
+    def jump_diagonal(self, row, col, dr, dc, dest):
+        walk = self.walkable
+        while True:
+            if not walk(row, col): return None
+            if row == dest[0] and col == dest[1]: return row, col
+            if (walk(row + dr, col - dc) and not walk(row, col - dc)) or (walk(row - dr, col + dc) and not walk(row - dr, col)):
+                return row, col
+            if self.jump_straight(row, col + dc, 0, dc, dest) or self.jump_straight(row + dr, col, dr, 0, dest):
+                return row, col
+            row += dr
+            col += dc
+
+    def jump(self, row, col, dr, dc, dest):
+        if dr and dc: return self.jump_diagonal(row, col, dr, dc, dest)
+        return self.jump_straight(row, col, dr, dc, dest)
+
+    # Directions worth exploring from a cell reached by moving in (dr, dc), after symmetry pruning
+    def pruned_directions(self, row, col, dr, dc):
+        walk = self.walkable
+        if not dr and not dc:
+            return STRAIGHT + DIAGONAL if self.diagonal else STRAIGHT
+        dirs = []
+        if self.diagonal:
+            if dr and dc:
+                dirs = [(dr, 0), (0, dc), (dr, dc)]
+                if not walk(row, col - dc): dirs.append((dr, -dc))
+                if not walk(row - dr, col): dirs.append((-dr, dc))
+            elif dc:
+                dirs = [(0, dc)]
+                if not walk(row + 1, col): dirs.append((1, dc))
+                if not walk(row - 1, col): dirs.append((-1, dc))
+            else:
+                dirs = [(dr, 0)]
+                if not walk(row, col + 1): dirs.append((dr, 1))
+                if not walk(row, col - 1): dirs.append((dr, -1))
+        elif dc:
+            dirs = [(-1, 0), (1, 0), (0, dc)]
+        else:
+            dirs = [(0, -1), (0, 1), (dr, 0)]
+        return dirs
+
+    # Run the search from src to dest; g/parent/stamp follow AStar's SearchState conventions.
+    # Counters are written to stats (an astar.SearchStats) when one is given
+    def search(self, src, dest, state, opened, closed, heuristic, stats=None):
+        if self.precompute and (self.dirty_rows or self.dirty_cols or not self.jump_table): self.build_tables()
+        g, parent, stamp = state.g, state.parent, state.stamp
+        COL = self.COL
+        dest_idx = dest[0] * COL + dest[1]
+        open_list = [(0.0, src[0] * COL + src[1])]
+        pushes, pops, stale_pops, reopenings, peak_open = 1, 0, 0, 0, 0
+        found = False
+        while open_list:
+            peak_open = max(peak_open, len(open_list))
+            idx = heapq.heappop(open_list)[1]
+            pops += 1
+            if stamp[idx] == closed:
+                stale_pops += 1
+                continue
+            stamp[idx] = closed
+            if idx == dest_idx:
+                found = True
+                break
+            row, col = divmod(idx, COL)
+            p_row, p_col = divmod(parent[idx], COL)
+            for dr, dc in self.pruned_directions(row, col, sign(row - p_row), sign(col - p_col)):
+                point = self.jump(row + dr, col + dc, dr, dc, dest)
+                if point is None: continue
+                new_idx = point[0] * COL + point[1]
+                if stamp[new_idx] == closed: continue
+                g_new = g[idx] + octile(point[0] - row, point[1] - col)
+                if stamp[new_idx] != opened or g[new_idx] > g_new:
+                    if stamp[new_idx] == opened: reopenings += 1
+                    g[new_idx] = g_new
+                    parent[new_idx] = idx
+                    stamp[new_idx] = opened
+                    heapq.heappush(open_list, (g_new + heuristic(point[0], point[1]), new_idx))
+                    pushes += 1
+        if stats is not None: stats.record(pushes, pops, stale_pops, reopenings, pushes - 1, pops - stale_pops - found, peak_open)
+        return found
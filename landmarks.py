@@ -0,0 +1,120 @@
+import os
+import struct
+import zlib
+from array import array
+from connectivity import ConnectivityIndex
+from flowfield import FlowField
+from neighbors import NeighborMasks, octile
+
+INF = float('inf')
+
+# Landmark file: this header, the landmark cells (array 'i') and one distance field (array 'd') per landmark
+MAGIC = b'ALT2'
+HEADER = struct.Struct('<4sIIIII')  # magic, rows, cols, diagonal, count, grid checksum
+
+
+# Landmark (ALT) heuristic over the same grid and moves as AStar.
+# Distances from a few well-spread landmark cells to every cell are computed once; by the triangle
+# inequality |d(L, t) - d(L, n)| never overestimates d(n, t), and on mazes it is far tighter than
+# any geometric distance. The fields can be saved next to the map and reloaded while the grid matches.
+class Landmarks:
+    def __init__(self, grid, diagonal=True, count=8, path=None, components=None):
+        self.grid = grid
+        self.ROW = len(grid)
+        self.COL = len(grid[0])
+        self.diagonal = diagonal
+        self.count = count
+        self.path = path  # File the fields are loaded from and saved to, if any
+        self.components = components  # ConnectivityIndex to reuse when picking landmarks
+        self.landmarks = []  # Flat indices of the landmark cells
+        self.fields = []  # Distance from each landmark to every cell, INF where unreachable
+        self.stale = True  # Fields must be (re)built or loaded before the next estimate
+        self.targets = {}  # Target cell -> its distance in every field, for the few targets in use
+
+    # Distances from one cell to every cell: the flow field's Dijkstra over the neighbour masks, whose move
+    # costs are symmetric, so the same field serves as distances to the landmark
+    def distance_field(self, source, neighbors):
+        return FlowField(self.grid, divmod(source, self.COL), self.diagonal, neighbors).dist
+
+    # Pick landmarks by farthest-point sampling inside the largest component: each new landmark is the
+    # cell farthest from all earlier ones, which spreads them around the edges of the map.
+    # The fields use the 'allow' corner rule, whose distances are lower bounds under every rule
+    def build(self):
+        self.landmarks, self.fields = [], []
+        components = self.components or ConnectivityIndex(self.grid, self.diagonal)
+        if not components.sizes: return
+        neighbors = NeighborMasks(self.grid, self.diagonal)
+        largest = max(components.sizes, key=components.sizes.get)
+        closest = self.distance_field(components.labels.index(largest), neighbors)
+        for _ in range(self.count):
+            farthest = max((d for d in closest if d != INF), default=0.0)
+            if farthest == 0.0: break
+            landmark = closest.index(farthest)
+            field = self.distance_field(landmark, neighbors)
+            self.landmarks.append(landmark)
+            self.fields.append(field)
+            closest = array('d', map(min, closest, field))
+
+    # Cheap fingerprint of the grid contents, stored with the fields to detect a changed map
+    def checksum(self):
+        crc = 0
+        for row in self.grid: crc = zlib.crc32(bytes(row), crc)
+        return crc
+
+    # Written beside the target and moved over it, so a save cut short never leaves a partial file behind
+    def save(self, path):
+        partial = path + '.tmp'
+        with open(partial, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.ROW, self.COL, self.diagonal, len(self.landmarks), self.checksum()))
+            array('i', self.landmarks).tofile(f)
+            for field in self.fields: field.tofile(f)
+        os.replace(partial, path)
+
+    # Load fields saved for this very grid and move set; returns False if the file is missing, does not match
+    # or is not as long as its header says (a truncated or corrupt file)
+    def load(self, path):
+        if not os.path.exists(path): return False
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size: return False
+            magic, rows, cols, diagonal, count, crc = HEADER.unpack(header)
+            if (magic, rows, cols, bool(diagonal)) != (MAGIC, self.ROW, self.COL, self.diagonal) or crc != self.checksum(): return False
+            if os.fstat(f.fileno()).st_size != HEADER.size + count * (array('i').itemsize + array('d').itemsize * rows * cols): return False
+            landmarks = array('i')
+            landmarks.fromfile(f, count)
+            fields = []
+            for _ in range(count):
+                field = array('d')
+                field.fromfile(f, rows * cols)
+                fields.append(field)
+        self.landmarks, self.fields = list(landmarks), fields
+        return True
+
+    # Build or load the fields if an edit or a new instance left them out of date
+    def refresh(self):
+        if not self.stale: return
+        if self.path is None or not self.load(self.path):
+            self.build()
+            if self.path is not None: self.save(self.path)
+        self.stale = False
+
+    # New walls only make paths longer, so the old fields stay admissible; a freed or re-costed cell can
+    # shorten paths and forces a rebuild before the next estimate
+    def update_cells(self, cells):
+        if any(self.grid[row][col] != 0 for row, col in cells):
+            self.stale = True
+            self.targets = {}
+
+    # Lower bound on the distance from cell idx to cell target: the best landmark bound, or the
+    # geometric distance where that is larger (or where no landmark reaches both cells)
+    def h(self, idx, target):
+        target_dist = self.targets.get(target)
+        if target_dist is None:
+            self.refresh()
+            if len(self.targets) >= 16: self.targets = {}
+            target_dist = self.targets[target] = [field[target] for field in self.fields]
+        best = octile(idx // self.COL - target // self.COL, idx % self.COL - target % self.COL, self.diagonal)
+        for field, to_target in zip(self.fields, target_dist):
+            d = field[idx]
+            if d != INF and to_target != INF and abs(to_target - d) > best: best = abs(to_target - d)
+        return best
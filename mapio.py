@@ -0,0 +1,69 @@
+import mmap
+import struct
+from batch import grid_view
+
+# Packed grid file: this header followed by rows * cols bytes, one cell value per byte, row by row
+MAGIC = b'AGRD'
+HEADER = struct.Struct('<4sII')  # magic, rows, cols
+
+# MovingAI terrain: ground ('.', 'G') and swamp ('S') are passable; trees, water and out-of-bounds are not
+_PASSABLE = bytes(1 if chr(c) in '.GS' else 0 for c in range(256))
+
+
+def _map_file(path, writable):
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY if writable else mmap.ACCESS_READ)
+
+
+# Read a MovingAI .map into row views over one byte per cell (1 passable, 0 blocked).
+# The body is translated in a single pass with the line breaks dropped, so no per-cell Python objects are made
+def read_map(path, writable=False):
+    with _map_file(path, False) as mm:
+        header = {}
+        while True:
+            line = mm.readline()
+            if not line: raise ValueError(f"{path}: missing 'map' line")
+            words = line.split()
+            if words == [b'map']: break
+            if len(words) == 2: header[words[0].decode()] = words[1].decode()
+        rows, cols = int(header['height']), int(header['width'])
+        cells = mm[mm.tell():].translate(_PASSABLE, b'\r\n')
+    if len(cells) < rows * cols: raise ValueError(f"{path}: expected {rows}x{cols} cells, found {len(cells)}")
+    buf = bytearray(cells) if writable else cells
+    return grid_view(memoryview(buf)[:rows * cols], rows, cols)
+
+
+# Read the queries of a MovingAI .scen file as (bucket, map name, src, dest, optimal length),
+# with src and dest as [row, col] like the rest of the project (the file stores x, y)
+def read_scen(path):
+    queries = []
+    with open(path) as f:
+        for line in f:
+            fields = line.rstrip('\r\n').split('\t')
+            if len(fields) < 9: continue
+            bucket, name, _, _, sx, sy, gx, gy, optimal = fields[:9]
+            queries.append((int(bucket), name, [int(sy), int(sx)], [int(gy), int(gx)], float(optimal)))
+    return queries
+
+
+def write_packed(grid, path):
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(grid), len(grid[0])))
+        for row in grid: f.write(bytes(row))
+
+
+# Map a packed grid file straight into row views: nothing is read until a cell is touched.
+# With writable=True edits go to private copy-on-write pages and never reach the file
+def read_packed(path, writable=False):
+    mm = _map_file(path, writable)
+    if len(mm) < HEADER.size: raise ValueError(f"{path}: not a packed grid file")
+    magic, rows, cols = HEADER.unpack_from(mm)
+    if magic != MAGIC: raise ValueError(f"{path}: not a packed grid file")
+    if len(mm) - HEADER.size < rows * cols: raise ValueError(f"{path}: expected {rows}x{cols} cells, found {len(mm) - HEADER.size}")
+    return grid_view(memoryview(mm)[HEADER.size:HEADER.size + rows * cols], rows, cols)
+
+
+# Load a grid from a .map or packed file, chosen by extension
+def load_map(path, writable=False):
+    if path.endswith('.map'): return read_map(path, writable)
+    return read_packed(path, writable)
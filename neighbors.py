@@ -0,0 +1,99 @@
+# The cost model every engine shares: moves as (dr, dc, length), and a move costs its length times the
+# mean cost of the two cells it joins
+ROOT2 = 2 ** 0.5
+STRAIGHT = [(0, 1, 1.0), (0, -1, 1.0), (1, 0, 1.0), (-1, 0, 1.0)]
+DIAGONAL = [(1, 1, ROOT2), (1, -1, ROOT2), (-1, 1, ROOT2), (-1, -1, ROOT2)]
+
+
+# Moves of the 8-connected grid, or of the 4-connected one without diagonals
+def moves(diagonal=True): return STRAIGHT + DIAGONAL if diagonal else STRAIGHT
+
+
+# Length of the move (dr, dc) to a neighbouring cell
+def move_length(dr, dc): return ROOT2 if dr and dc else 1.0
+
+
+# Cost of a move of the given length between cells costing here and there
+def step_cost(length, here, there): return length * (here + there) / 2
+
+
+# step_cost of a move of the given length for every sum of two cell costs, so the hot loops look costs up
+# instead of computing them (step_cost only depends on the sum of the two costs)
+def cost_table(length): return [step_cost(length, total // 2, total - total // 2) for total in range(2 * MAX_COST + 1)]
+
+
+# Cheapest cost of going dr rows and dc columns over cells costing 1: the octile distance, or the
+# Manhattan distance without diagonals. No cell costs less than 1, so it never overestimates
+def octile(dr, dc, diagonal=True):
+    dr, dc = abs(dr), abs(dc)
+    return max(dr, dc) + (ROOT2 - 1) * min(dr, dc) if diagonal else dr + dc
+
+# How a diagonal move may pass the corners of walls:
+#   'allow'       always (the classic behaviour, and the only one JPS and HPA* implement)
+#   'no-squeeze'  unless both cells beside the move are walls
+#   'none'        only if both cells beside the move are free
+CORNER_RULES = ('allow', 'no-squeeze', 'none')
+
+MAX_COST = 255  # Cells are 0 for walls or an integer cost from 1 to MAX_COST, so every row fits in bytes
+_PASSABLE = bytes([0] + [1] * MAX_COST)
+
+
+# Refuse grids holding anything but walls and integer costs from 1 to MAX_COST, checking only the rows of
+# cells when given. The derived structures keep rows as bytes, and the geometric heuristics assume no cell costs less than 1
+def check_costs(grid, cells=None):
+    for r in range(len(grid)) if cells is None else {row for row, _ in cells}:
+        try: bytes(grid[r])
+        except (TypeError, ValueError):
+            c, value = next((c, v) for c, v in enumerate(grid[r]) if not isinstance(v, int) or not 0 <= v <= MAX_COST)
+            raise ValueError(f"cell {(r, c)} holds {value!r}; cells must be 0 for a wall or an integer cost from 1 to {MAX_COST}") from None
+
+
+# Passable-neighbour masks of every cell: bit k of a cell's mask is set when the move moves[k] leads to a
+# free cell inside the grid and the corner rule allows it, and walls have no moves at all.
+# table[mask] lists those moves as (dr, dc, flat offset, cost), where cost[a + b] is the step_cost of the move
+# between cells costing a and b, so a search iterates only real successors with no bounds or wall checks. The masks are computed a row at a time, with each row held as one integer
+# of one byte per cell, so shifting it by a byte looks at every cell's left or right neighbour at once.
+class NeighborMasks:
+    def __init__(self, grid, diagonal=True, corners='allow'):
+        if corners not in CORNER_RULES: raise ValueError(f"corner rule must be one of {CORNER_RULES}, not {corners!r}")
+        self.grid = grid
+        self.ROW = len(grid)
+        self.COL = len(grid[0])
+        self.diagonal = diagonal
+        self.corners = corners
+        self.moves = moves(diagonal)
+        costs = {length: cost_table(length) for _, _, length in self.moves}
+        self.table = [tuple((dr, dc, dr * self.COL + dc, costs[length]) for k, (dr, dc, length) in enumerate(self.moves) if mask >> k & 1)
+                      for mask in range(1 << len(self.moves))]
+        self.full = (1 << 8 * self.COL) - 1
+        self.rows = [self.row_bits(r) for r in range(self.ROW)]  # Passability of each row, one byte per cell
+        self.masks = bytearray(self.ROW * self.COL)
+        for r in range(self.ROW): self.build_row(r)
+
+    def row_bits(self, r): return int.from_bytes(bytes(self.grid[r]).translate(_PASSABLE), 'big')
+
+    # Passability of the (dr, dc) neighbour of every cell in row r
+    def shifted(self, r, dr, dc):
+        if not 0 <= r + dr < self.ROW: return 0
+        bits = self.rows[r + dr]
+        return (bits << 8) & self.full if dc == 1 else bits >> 8 if dc == -1 else bits
+
+    def build_row(self, r):
+        mask = 0
+        for k, (dr, dc, _) in enumerate(self.moves):
+            allowed = self.shifted(r, dr, dc)
+            if dr and dc and self.corners == 'no-squeeze': allowed &= self.shifted(r, dr, 0) | self.shifted(r, 0, dc)
+            elif dr and dc and self.corners == 'none': allowed &= self.shifted(r, dr, 0) & self.shifted(r, 0, dc)
+            mask |= allowed << k
+        mask &= self.rows[r] * 0xFF
+        self.masks[r * self.COL:(r + 1) * self.COL] = mask.to_bytes(self.COL, 'big')
+
+    # An edit changes the masks of its own row and of the rows above and below it
+    def update_cells(self, cells):
+        edited = {row for row, _ in cells}
+        for r in edited: self.rows[r] = self.row_bits(r)
+        for r in {r + dr for r in edited for dr in (-1, 0, 1)}:
+            if 0 <= r < self.ROW: self.build_row(r)
+
+    # Moves out of cell idx as (dr, dc, flat offset, cost)
+    def successors(self, idx): return self.table[self.masks[idx]]
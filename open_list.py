@@ -0,0 +1,124 @@
+import heapq
+from array import array
+
+# Open lists for AStar's search, all with the same interface over flat cell indices:
+#   push(idx, f, h)      queue a cell that is not queued yet
+#   decrease(idx, f, h)  lower the key of a queued cell (the caller only calls it with a smaller f)
+#   pop()                take the cell with the smallest f, ties going to the smaller h and then the smaller index
+#   clear(), len()
+# Preferring the smaller h on equal f expands the cells nearest the destination first, so on the wide
+# f plateaus of grids the search runs straight at the goal instead of widening the front.
+# The lazy queues handle decrease by queueing the cell again; the older entry surfaces after the cell
+# was expanded and is skipped by the caller, which already tracks closed cells.
+
+
+# heapq with lazy deletion: the fastest in CPython, at the price of stale entries in the heap
+class LazyHeap:
+    def __init__(self, size):
+        self.heap = []
+
+    def push(self, idx, f, h): heapq.heappush(self.heap, (f, h, idx))
+
+    decrease = push
+
+    def pop(self): return heapq.heappop(self.heap)[2]
+
+    def clear(self): self.heap = []
+
+    def __len__(self): return len(self.heap)
+
+
+# Binary heap indexed by cell, with true decrease-key: every cell is in the heap at most once,
+# so it never holds stale entries and its size is exactly the number of open cells
+class IndexedHeap:
+    def __init__(self, size):
+        self.heap = []  # (f, h, idx) entries in heap order
+        self.pos = array('i', [-1]) * size  # Slot of each queued cell in heap, -1 when not queued
+
+    def push(self, idx, f, h):
+        self.heap.append((f, h, idx))
+        self.sift_up(len(self.heap) - 1)
+
+    def decrease(self, idx, f, h):
+        slot = self.pos[idx]
+        self.heap[slot] = (f, h, idx)
+        self.sift_up(slot)
+
+    def pop(self):
+        heap, pos = self.heap, self.pos
+        top = heap[0][2]
+        pos[top] = -1
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            self.sift_down(0)
+        return top
+
+    def sift_up(self, slot):
+        heap, pos = self.heap, self.pos
+        entry = heap[slot]
+        while slot > 0:
+            parent = (slot - 1) >> 1
+            if heap[parent] <= entry: break
+            heap[slot] = heap[parent]
+            pos[heap[slot][2]] = slot
+            slot = parent
+        heap[slot] = entry
+        pos[entry[2]] = slot
+
+    def sift_down(self, slot):
+        heap, pos = self.heap, self.pos
+        entry, end = heap[slot], len(self.heap)
+        child = 2 * slot + 1
+        while child < end:
+            if child + 1 < end and heap[child + 1] < heap[child]: child += 1
+            if entry <= heap[child]: break
+            heap[slot] = heap[child]
+            pos[heap[slot][2]] = slot
+            slot = child
+            child = 2 * slot + 1
+        heap[slot] = entry
+        pos[entry[2]] = slot
+
+    # Forget the cells still queued, touching only those, so the index is reused without reallocating
+    def clear(self):
+        for _, _, idx in self.heap: self.pos[idx] = -1
+        self.heap = []
+
+    def __len__(self): return len(self.heap)
+
+
+# Bucket queue for searches whose f values are all multiples of 1/scale (Manhattan moves over integer
+# cell costs: mean costs are multiples of 1/2). Bucket k holds the cells with f == k / scale in a small heap
+# ordered by h, and the cursor only moves back when an inconsistent (weighted) heuristic queues a smaller f
+class BucketQueue:
+    def __init__(self, size, scale=2):
+        self.scale = scale
+        self.buckets = []
+        self.cursor = 0  # No bucket below this one holds entries
+        self.count = 0
+
+    def push(self, idx, f, h):
+        k = round(f * self.scale)
+        if k >= len(self.buckets): self.buckets.extend([] for _ in range(k + 1 - len(self.buckets)))
+        heapq.heappush(self.buckets[k], (h, idx))
+        if k < self.cursor: self.cursor = k
+        self.count += 1
+
+    decrease = push
+
+    def pop(self):
+        buckets = self.buckets
+        while not buckets[self.cursor]: self.cursor += 1
+        self.count -= 1
+        return heapq.heappop(buckets[self.cursor])[1]
+
+    def clear(self):
+        self.buckets = []
+        self.cursor = 0
+        self.count = 0
+
+    def __len__(self): return self.count
+
+
+QUEUES = {'heap': LazyHeap, 'indexed': IndexedHeap, 'bucket': BucketQueue}
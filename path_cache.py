@@ -0,0 +1,45 @@
+import itertools
+from collections import OrderedDict
+
+# Grid versions come from one process-wide counter, so two different grids never share a version
+_versions = itertools.count(1)
+
+def next_version(): return next(_versions)
+
+
+# Bounded LRU cache of search results. Keys include the grid version, so an edit to the grid
+# makes every older entry unreachable and it simply ages out of the cache.
+class PathCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Build the key for one query
+    @staticmethod
+    def key(version, src, dest, heuristic_type, mode='A*'): return (version, tuple(src), tuple(dest), heuristic_type, mode)
+
+    def get(self, key, default=None):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self): self.entries.clear()
+
+    # Counters for sizing the cache
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self.entries),
+                'maxsize': self.maxsize, 'hit_rate': self.hits / lookups if lookups else 0.0}
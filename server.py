@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from astar import AStar
+from batch import SharedGrid, grid_view
+from mapio import load_map
+from path_cache import PathCache, next_version
+
+# Protocol: one JSON object per line each way, over a localhost TCP port or a Unix socket.
+#   request:  {"id": 7, "map": "arena", "src": [r, c], "dest": [r, c], "heuristic": "Euclidean", "mode": "A*"}
+#   response: {"id": 7, "status": 0, "path": [[r, c], ...], "latency_ms": 1.9, "coalesced": false, "cached": false}
+# status follows the a_star_search contract (0 found, -1 invalid, -2 blocked, -3 unreachable) and path is null
+# unless it is 0; "heuristic" and "mode" are optional. A request that cannot be read gets {"id": ..., "error": "..."}.
+# Responses can arrive out of order, so clients match them to requests by id.
+HEURISTICS = ('Euclidean', 'Manhattan', 'Diagonal', 'ALT')
+MODES = ('A*', 'Bidirectional', 'ARA*', 'JPS', 'JPS+', 'HPA*', 'Flow')
+
+
+# Per-process state: the attached blocks and one AStar per map, whose search buffers and derived
+# structures (JPS tables, landmarks, flow fields) are reused by every query on that map
+_worker = {}
+
+def _init_worker(maps):
+    for name, (shm_name, rows, cols) in maps.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _worker[name] = (shm, AStar(grid_view(shm.buf, rows, cols), [0, 0], [0, 0], imported=True))
+
+def _solve(name, src, dest, heuristic_type, mode):
+    astar = _worker[name][1]
+    astar.set_query(src, dest, heuristic_type=heuristic_type, mode=mode)
+    status = astar.a_star_search()
+    return status, [list(cell) for cell in astar.trace_path()] if status == 0 else None
+
+
+# Long-lived query service: maps are loaded once into shared memory, solves run in a process pool,
+# identical queries already being solved share one solve, and finished results are kept in a PathCache
+class PathServer:
+    def __init__(self, maps, processes=None, cache_size=4096):
+        self.shared = {}  # map name -> SharedGrid the workers attach to
+        for name, grid in maps.items(): self.shared[name] = SharedGrid(grid)
+        self.versions = {name: next_version() for name in maps}  # Maps never change while served
+        self.pool = ProcessPoolExecutor(processes, initializer=_init_worker,
+                                        initargs=({name: (s.name, s.rows, s.cols) for name, s in self.shared.items()},))
+        self.in_flight = {}  # query key -> future of the solve answering it
+        self.cache = PathCache(cache_size)
+        self.served = 0
+        self.coalesced = 0
+
+    def close(self):
+        self.pool.shutdown()
+        for shared in self.shared.values(): shared.close()
+
+    # Drop a finished solve from in_flight and keep its result for later requests
+    def finish(self, key, future):
+        del self.in_flight[key]
+        if not future.cancelled() and future.exception() is None: self.cache.put(key, future.result())
+
+    # Answer one request line with a response dict
+    async def handle(self, line):
+        started = time.perf_counter()
+        request = None
+        try:
+            request = json.loads(line)
+            name, src, dest = request['map'], request['src'], request['dest']
+            heuristic_type, mode = request.get('heuristic', 'Euclidean'), request.get('mode', 'A*')
+            if name not in self.shared: raise ValueError(f"unknown map {name!r}")
+            if heuristic_type not in HEURISTICS: raise ValueError(f"unknown heuristic {heuristic_type!r}")
+            if mode not in MODES: raise ValueError(f"unknown mode {mode!r}")
+            src, dest = [int(src[0]), int(src[1])], [int(dest[0]), int(dest[1])]
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            return {'id': request.get('id') if isinstance(request, dict) else None, 'error': str(e)}
+
+        key = PathCache.key(self.versions[name], src, dest, heuristic_type, mode)
+        result = self.cache.get(key)
+        cached, coalesced = result is not None, key in self.in_flight
+        if result is None:
+            if coalesced:
+                self.coalesced += 1
+            else:
+                future = asyncio.get_running_loop().run_in_executor(self.pool, _solve, name, src, dest, heuristic_type, mode)
+                future.add_done_callback(lambda done: self.finish(key, done))
+                self.in_flight[key] = future
+            try:
+                # Shielded, so a client that goes away does not cancel a solve other requests are waiting on
+                result = await asyncio.shield(self.in_flight[key])
+            except Exception as e:
+                return {'id': request.get('id'), 'error': f"solve failed: {e}"}
+        self.served += 1
+        status, path = result
+        return {'id': request.get('id'), 'status': status, 'path': path, 'latency_ms': (time.perf_counter() - started) * 1000,
+                'coalesced': coalesced, 'cached': cached}
+
+    # One connection: every line is answered as soon as its solve finishes, so a slow query does not hold up the rest
+    async def serve_client(self, reader, writer):
+        pending = set()
+
+        async def answer(line):
+            response = await self.handle(line)
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                if not line.strip(): continue
+                task = asyncio.create_task(answer(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending: await asyncio.gather(*pending)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, unix=None):
+        if unix: server = await asyncio.start_unix_server(self.serve_client, unix)
+        else: server = await asyncio.start_server(self.serve_client, host, port)
+        print("Serving", ", ".join(self.shared), "on", unix or f"{host}:{port}")
+        # Stop cleanly on Ctrl-C or SIGTERM so the shared memory blocks are released (Windows only has Ctrl-C)
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try: asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+            except NotImplementedError: pass
+        async with server:
+            await stop.wait()
+        if unix and os.path.exists(unix): os.remove(unix)
+        print("Served", self.served, "requests,", self.coalesced, "coalesced, cache", self.cache.stats())
+
+
+# Map name used in requests: the file name without its extension
+def map_name(path): return os.path.splitext(os.path.basename(path))[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve path queries on preloaded maps over a local JSON-lines socket")
+    parser.add_argument('maps', nargs='+', help="MovingAI .map or packed grid files")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="listen on this Unix socket path instead of TCP")
+    parser.add_argument('--processes', type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    server = PathServer({map_name(path): load_map(path) for path in args.maps}, args.processes)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import heapq
+import math
+
+INF = float('inf')
+
+
+# Whether the corner rule lets a diagonal move from (r, c) to (nr, nc) pass the two cells beside it:
+# 'allow' always, 'no-squeeze' unless both are walls, 'none' only if both are free
+def corner_ok(grid, r, c, nr, nc, corners):
+    if r == nr or c == nc or corners == 'allow': return True
+    beside = (grid[nr][c] != 0) + (grid[r][nc] != 0)
+    return beside >= 1 if corners == 'no-squeeze' else beside == 2
+
+
+# Plain Dijkstra written independently of the engines under test: 4 or 8 moves, diagonals pass wall
+# corners as the corner rule allows, and a move costs its length times the mean cost of its two cells.
+# Returns source -> cell costs
+def dijkstra(grid, src, diagonal=True, corners='allow'):
+    rows, cols = len(grid), len(grid[0])
+    moves = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr or dc) and (diagonal or not (dr and dc))]
+    dist = {tuple(src): 0.0}
+    heap = [(0.0, tuple(src))]
+    while heap:
+        d, (r, c) = heapq.heappop(heap)
+        if d > dist[(r, c)]: continue
+        for dr, dc in moves:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols and grid[nr][nc] != 0 and corner_ok(grid, r, c, nr, nc, corners):
+                nd = d + math.hypot(dr, dc) * (grid[r][c] + grid[nr][nc]) / 2
+                if nd < dist.get((nr, nc), INF):
+                    dist[(nr, nc)] = nd
+                    heapq.heappush(heap, (nd, (nr, nc)))
+    return dist
+
+
+# Cost of a path of (row, col) cells, checking that every cell is free and every move is to a neighbour
+# the corner rule allows
+def path_cost(grid, path, diagonal=True, corners='allow'):
+    cost = 0.0
+    for (r, c), (nr, nc) in zip(path, path[1:]):
+        assert grid[nr][nc] != 0, f"path enters wall {(nr, nc)}"
+        assert max(abs(nr - r), abs(nc - c)) == 1 and (diagonal or abs(nr - r) + abs(nc - c) == 1), f"bad move {(r, c)} -> {(nr, nc)}"
+        assert corner_ok(grid, r, c, nr, nc, corners), f"move {(r, c)} -> {(nr, nc)} cuts a corner"
+        cost += math.hypot(nr - r, nc - c) * (grid[r][c] + grid[nr][nc]) / 2
+    return cost
+
+
+# Random grid of walls (0) and free cells drawn from costs
+def random_grid(rng, rows, cols, density=0.3, costs=(1,)):
+    return [[0 if rng.random() < density else rng.choice(costs) for _ in range(cols)] for _ in range(rows)]
+
+
+def random_free_cell(rng, grid):
+    free = [(r, c) for r, row in enumerate(grid) for c, value in enumerate(row) if value != 0]
+    return list(rng.choice(free))
@@ -0,0 +1,69 @@
+import math
+import random
+import pytest
+from astar import AStar
+from reference import dijkstra, path_cost, random_grid, random_free_cell, INF
+
+
+def check(astar, grid, diagonal, status):
+    expected = dijkstra(grid, astar.src, diagonal).get(tuple(astar.dest), INF)
+    if expected == INF:
+        assert status == -3
+        return
+    assert status == 0
+    path = astar.trace_path()
+    assert path[0] == tuple(astar.src) and path[-1] == tuple(astar.dest)
+    assert math.isclose(path_cost(grid, path, diagonal), expected)
+    if astar.src != astar.dest: assert astar.bound == 1.0
+
+
+# The two frontiers must stop only once the meeting path is optimal, and the halves must join into one path
+@pytest.mark.parametrize('heuristic_type', ['Euclidean', 'Manhattan'])
+@pytest.mark.parametrize('seed', range(25))
+def test_optimal_on_weighted_grids(seed, heuristic_type):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 16, 20, costs=(1, 1, 2, 7))
+    astar = AStar(grid, [0, 0], [0, 0], heuristic_type=heuristic_type, imported=True, mode='Bidirectional')
+    for _ in range(5):
+        astar.set_query(random_free_cell(rng, grid), random_free_cell(rng, grid))
+        check(astar, grid, heuristic_type != 'Manhattan', astar.a_star_search())
+
+
+# The search is always exact, so a weight given for Weighted A* must not loosen it
+@pytest.mark.parametrize('seed', range(10))
+def test_weight_ignored(seed):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 15, 15, costs=(1, 4))
+    src, dest = random_free_cell(rng, grid), random_free_cell(rng, grid)
+    astar = AStar(grid, src, dest, imported=True, mode='Bidirectional', weight=3.0)
+    check(astar, grid, True, astar.a_star_search())
+
+
+# Run in steps (as the GUI does) it must give the same result as in one go
+@pytest.mark.parametrize('seed', range(10))
+def test_steps(seed):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 20, 20, costs=(1, 3))
+    src, dest = random_free_cell(rng, grid), random_free_cell(rng, grid)
+    astar = AStar(grid, src, dest, imported=True, mode='Bidirectional')
+    steps = astar.a_star_steps(batch=3)
+    try:
+        while True: next(steps)
+    except StopIteration as done:
+        check(astar, grid, True, done.value)
+
+
+# Edits between queries must be seen by both frontiers
+@pytest.mark.parametrize('seed', range(10))
+def test_after_edits(seed):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 12, 16, costs=(1, 1, 5))
+    src, dest = random_free_cell(rng, grid), random_free_cell(rng, grid)
+    astar = AStar(grid, src, dest, imported=True, mode='Bidirectional')
+    check(astar, grid, True, astar.a_star_search())
+    for _ in range(10):
+        cells = [(rng.randrange(12), rng.randrange(16)) for _ in range(rng.randint(1, 4))]
+        cells = [cell for cell in cells if list(cell) not in (src, dest)]
+        for r, c in cells: grid[r][c] = rng.choice((0, 1, 5))
+        astar.update_cells(cells)
+        check(astar, grid, True, astar.a_star_search())
@@ -0,0 +1,49 @@
+import random
+import pytest
+from connectivity import ConnectivityIndex
+from reference import dijkstra, random_grid
+
+
+# The labels must split the free cells into exactly the reference components, with matching sizes
+def check(index, grid, diagonal):
+    seen = set()
+    for r, row in enumerate(grid):
+        for c, value in enumerate(row):
+            label = index.labels[r * index.COL + c]
+            if value == 0:
+                assert label == 0
+                continue
+            if (r, c) in seen: continue
+            component = set(dijkstra(grid, (r, c), diagonal))
+            seen |= component
+            assert {index.labels[i * index.COL + j] for i, j in component} == {label}
+            assert index.sizes[label] == len(component)
+    assert sum(index.sizes.values()) == len(seen)
+
+
+# Walls drawn one at a time split components (the flood in ConnectivityIndex.split); erasing them joins them again
+@pytest.mark.parametrize('diagonal', [True, False])
+@pytest.mark.parametrize('seed', range(20))
+def test_single_cell_edits(seed, diagonal):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 10, 12, density=0.25, costs=(1, 4))
+    index = ConnectivityIndex(grid, diagonal)
+    check(index, grid, diagonal)
+    for _ in range(40):
+        r, c = rng.randrange(10), rng.randrange(12)
+        grid[r][c] = 0 if grid[r][c] else rng.choice((1, 4))
+        index.update_cells([(r, c)])
+        check(index, grid, diagonal)
+
+
+# Cutting a corridor in the middle leaves two components of the right sizes
+def test_split_corridor():
+    grid = [[1] * 9]
+    index = ConnectivityIndex(grid)
+    grid[0][3] = 0
+    index.update_cells([(0, 3)])
+    assert not index.connected([0, 0], [0, 8])
+    assert sorted(index.sizes.values()) == [3, 5]
+    grid[0][3] = 1
+    index.update_cells([(0, 3)])
+    assert index.connected([0, 0], [0, 8]) and list(index.sizes.values()) == [9]
@@ -0,0 +1,53 @@
+import math
+import random
+import pytest
+from dstar_lite import DStarLite
+from reference import dijkstra, path_cost, random_grid, random_free_cell, INF
+
+
+def check(planner, grid, diagonal):
+    expected = dijkstra(grid, planner.dest, diagonal).get(tuple(planner.src), INF)
+    status = planner.compute_path()
+    if expected == INF:
+        assert status == -3
+        return
+    assert status == 0
+    path = planner.trace_path()
+    assert path[0] == tuple(planner.src) and path[-1] == tuple(planner.dest)
+    assert math.isclose(path_cost(grid, path, diagonal), expected)
+
+
+# Walls and costs edited between replans must give the same costs as planning from scratch
+@pytest.mark.parametrize('heuristic_type', ['Euclidean', 'Manhattan'])
+@pytest.mark.parametrize('seed', range(20))
+def test_repair_after_edits(seed, heuristic_type):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 12, 15, costs=(1, 1, 3))
+    src, dest = random_free_cell(rng, grid), random_free_cell(rng, grid)
+    diagonal = heuristic_type != 'Manhattan'
+    planner = DStarLite(grid, src, dest, heuristic_type)
+    check(planner, grid, diagonal)
+    for _ in range(15):
+        cells = [(rng.randrange(12), rng.randrange(15)) for _ in range(rng.randint(1, 4))]
+        cells = [cell for cell in cells if list(cell) not in (src, dest)]
+        for r, c in cells: grid[r][c] = rng.choice((0, 1, 5))
+        planner.update_cells(cells)
+        check(planner, grid, diagonal)
+
+
+# Moving the start along the path (the key modifier case) while walls appear ahead of it
+@pytest.mark.parametrize('seed', range(20))
+def test_repair_after_moving_start(seed):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 14, 14, density=0.2)
+    src, dest = random_free_cell(rng, grid), random_free_cell(rng, grid)
+    planner = DStarLite(grid, src, dest)
+    check(planner, grid, True)
+    while planner.compute_path() == 0 and planner.src != planner.dest:
+        path = planner.trace_path()
+        planner.move_start(list(path[1]))
+        r, c = rng.randrange(14), rng.randrange(14)
+        if [r, c] not in (planner.src, planner.dest) and grid[r][c] != 0:
+            grid[r][c] = 0
+            planner.update_cells([(r, c)])
+        check(planner, grid, True)
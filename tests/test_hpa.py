@@ -0,0 +1,75 @@
+import math
+import random
+import pytest
+from astar import AStar
+from hpa import HierarchicalGraph
+from reference import dijkstra, path_cost, random_grid, random_free_cell, INF
+
+
+# HPA* paths are not always optimal, but they must exist exactly when the reference finds one, run from
+# src to dest through valid moves and cost no less than the optimum
+def check(grid, src, dest, diagonal, path):
+    expected = dijkstra(grid, src, diagonal).get(tuple(dest), INF)
+    if expected == INF:
+        assert path is None
+        return None
+    assert path is not None
+    assert path[0] == tuple(src) and path[-1] == tuple(dest)
+    cost = path_cost(grid, path, diagonal)
+    assert cost >= expected - 1e-9
+    return cost
+
+
+def solve(graph, src, dest):
+    abstract = graph.find_path(src, dest)
+    return None if abstract is None else list(graph.refine(abstract))
+
+
+@pytest.mark.parametrize('heuristic_type', ['Euclidean', 'Manhattan'])
+@pytest.mark.parametrize('seed', range(10))
+def test_paths_through_astar(seed, heuristic_type):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 36, 40, density=0.25, costs=(1, 1, 3))
+    astar = AStar(grid, [0, 0], [0, 0], heuristic_type=heuristic_type, imported=True, mode='HPA*')
+    for _ in range(5):
+        src, dest = random_free_cell(rng, grid), random_free_cell(rng, grid)
+        astar.set_query(src, dest)
+        status = astar.a_star_search()
+        check(grid, src, dest, heuristic_type != 'Manhattan', astar.trace_path() if status == 0 else None)
+        assert status in (0, -3)
+
+
+# Edits must discard every cluster and border they touch: the kept graph then answers exactly as a
+# graph built from scratch on the edited grid
+@pytest.mark.parametrize('diagonal', [True, False])
+@pytest.mark.parametrize('seed', range(10))
+def test_after_edits(seed, diagonal):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 17, 19, density=0.25, costs=(1, 1, 4))
+    graph = HierarchicalGraph(grid, diagonal, cluster_size=4)
+    for _ in range(12):
+        for _ in range(3):
+            src, dest = random_free_cell(rng, grid), random_free_cell(rng, grid)
+            cost = check(grid, src, dest, diagonal, solve(graph, src, dest))
+            fresh = solve(HierarchicalGraph(grid, diagonal, cluster_size=4), src, dest)
+            assert (cost is None) == (fresh is None)
+            if cost is not None: assert math.isclose(cost, path_cost(grid, fresh, diagonal))
+        cells = [(rng.randrange(17), rng.randrange(19)) for _ in range(rng.randint(1, 4))]
+        for r, c in cells: grid[r][c] = rng.choice((0, 1, 4))
+        graph.update_cells(cells)
+
+
+# Edits made through AStar reach its HPA* graph
+@pytest.mark.parametrize('seed', range(6))
+def test_astar_edits(seed):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 36, 36, density=0.2)
+    astar = AStar(grid, [0, 0], [0, 0], imported=True, mode='HPA*')
+    for _ in range(8):
+        src, dest = random_free_cell(rng, grid), random_free_cell(rng, grid)
+        astar.set_query(src, dest)
+        status = astar.a_star_search()
+        check(grid, src, dest, True, astar.trace_path() if status == 0 else None)
+        cells = [(rng.randrange(36), rng.randrange(36)) for _ in range(rng.randint(3, 10))]
+        for r, c in cells: grid[r][c] = rng.choice((0, 0, 1))
+        astar.update_cells(cells)
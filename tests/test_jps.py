@@ -0,0 +1,64 @@
+import math
+import random
+import pytest
+from astar import AStar
+from reference import dijkstra, path_cost, random_grid, random_free_cell, INF
+
+
+def check(astar, grid, diagonal, status):
+    expected = dijkstra(grid, astar.src, diagonal).get(tuple(astar.dest), INF)
+    if expected == INF:
+        assert status == -3
+        return
+    assert status == 0
+    path = astar.trace_path()
+    assert path[0] == tuple(astar.src) and path[-1] == tuple(astar.dest)
+    assert math.isclose(path_cost(grid, path, diagonal), expected)
+
+
+# Jumps must land on optimal paths, and the halves between jump points must be filled in with valid moves
+@pytest.mark.parametrize('mode', ['JPS', 'JPS+'])
+@pytest.mark.parametrize('heuristic_type', ['Euclidean', 'Manhattan'])
+@pytest.mark.parametrize('seed', range(15))
+def test_optimal_on_uniform_grids(seed, heuristic_type, mode):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 18, 22, density=rng.choice((0.1, 0.3)))
+    astar = AStar(grid, [0, 0], [0, 0], heuristic_type=heuristic_type, imported=True, mode=mode)
+    for _ in range(5):
+        astar.set_query(random_free_cell(rng, grid), random_free_cell(rng, grid))
+        check(astar, grid, heuristic_type != 'Manhattan', astar.a_star_search())
+        assert astar.jump_points().uniform()
+
+
+# Walls added and removed through update_cells must reach the JPS+ tables of every row and column that sees them
+@pytest.mark.parametrize('mode', ['JPS', 'JPS+'])
+@pytest.mark.parametrize('heuristic_type', ['Euclidean', 'Manhattan'])
+@pytest.mark.parametrize('seed', range(20))
+def test_after_edits(seed, heuristic_type, mode):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 14, 17, density=0.2)
+    diagonal = heuristic_type != 'Manhattan'
+    astar = AStar(grid, [0, 0], [0, 0], heuristic_type=heuristic_type, imported=True, mode=mode)
+    for _ in range(15):
+        for _ in range(3):
+            astar.set_query(random_free_cell(rng, grid), random_free_cell(rng, grid))
+            check(astar, grid, diagonal, astar.a_star_search())
+        cells = [(rng.randrange(14), rng.randrange(17)) for _ in range(rng.randint(1, 4))]
+        for r, c in cells: grid[r][c] = rng.choice((0, 1))
+        astar.update_cells(cells)
+
+
+# A costed cell makes the grid non-uniform, so searches fall back to A* until it is cleared again
+@pytest.mark.parametrize('seed', range(10))
+def test_weighted_cell_falls_back(seed):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 12, 12, density=0.2)
+    src, dest = random_free_cell(rng, grid), random_free_cell(rng, grid)
+    astar = AStar(grid, src, dest, imported=True, mode='JPS+')
+    check(astar, grid, True, astar.a_star_search())
+    r, c = random_free_cell(rng, grid)
+    for value in (9, 1):
+        grid[r][c] = value
+        astar.update_cells([(r, c)])
+        assert astar.jump_points().uniform() == (value == 1)
+        check(astar, grid, True, astar.a_star_search())
@@ -0,0 +1,18 @@
+import os
+import random
+from astar import AStar
+from reference import random_grid
+
+
+# A landmark file cut short (e.g. by a process killed while saving) is rebuilt and rewritten, not fatal
+def test_truncated_file_is_rebuilt(tmp_path):
+    grid = random_grid(random.Random(0), 30, 30)
+    grid[0][0] = grid[29][29] = 1
+    path = str(tmp_path / 'grid.alt')
+    assert AStar(grid, [0, 0], [29, 29], heuristic_type='ALT', imported=True, landmark_file=path).a_star_search() in (0, -3)
+    size = os.path.getsize(path)
+    with open(path, 'r+b') as f: f.truncate(size // 2)
+    astar = AStar(grid, [0, 0], [29, 29], heuristic_type='ALT', imported=True, landmark_file=path)
+    assert astar.a_star_search() in (0, -3)
+    assert os.path.getsize(path) == size
+    assert os.listdir(tmp_path) == ['grid.alt']
@@ -0,0 +1,26 @@
+import pytest
+from mapio import load_map, write_packed
+
+
+def test_packed_round_trip(tmp_path):
+    grid = [[(r * 7 + c) % 4 for c in range(9)] for r in range(6)]
+    path = str(tmp_path / 'grid.grid')
+    write_packed(grid, path)
+    assert [list(row) for row in load_map(path)] == grid
+
+
+# A packed file cut short must be rejected when loaded, not hand short rows to the search
+@pytest.mark.parametrize('keep', [0, 5, 20, 60])
+def test_truncated_packed_file(tmp_path, keep):
+    path = str(tmp_path / 'grid.grid')
+    write_packed([[1] * 8 for _ in range(8)], path)
+    with open(path, 'r+b') as f: f.truncate(keep)
+    with pytest.raises(ValueError):
+        load_map(path)
+
+
+def test_truncated_map_file(tmp_path):
+    path = str(tmp_path / 'grid.map')
+    with open(path, 'w') as f: f.write("type octile\nheight 3\nwidth 4\nmap\n....\n.@@.\n")
+    with pytest.raises(ValueError):
+        load_map(path)
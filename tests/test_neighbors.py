@@ -0,0 +1,71 @@
+import math
+import random
+import pytest
+from astar import AStar
+from neighbors import CORNER_RULES, NeighborMasks, moves, step_cost
+from reference import corner_ok, dijkstra, path_cost, random_grid, random_free_cell, INF
+
+
+# Moves out of every cell worked out one by one, as (dr, dc) sets
+def brute_force(grid, diagonal, corners):
+    rows, cols = len(grid), len(grid[0])
+    out = []
+    for r in range(rows):
+        for c in range(cols):
+            out.append({(dr, dc) for dr, dc, _ in moves(diagonal) if grid[r][c] != 0 and 0 <= r + dr < rows and 0 <= c + dc < cols
+                        and grid[r + dr][c + dc] != 0 and corner_ok(grid, r, c, r + dr, c + dc, corners)})
+    return out
+
+
+def check_masks(masks, grid):
+    cols = len(grid[0])
+    for idx, expected in enumerate(brute_force(grid, masks.diagonal, masks.corners)):
+        successors = masks.successors(idx)
+        assert {(dr, dc) for dr, dc, _, _ in successors} == expected
+        r, c = divmod(idx, cols)
+        for dr, dc, offset, cost in successors:
+            assert offset == dr * cols + dc
+            here, there = grid[r][c], grid[r + dr][c + dc]
+            assert cost[here + there] == step_cost(math.hypot(dr, dc), here, there)
+
+
+# Masks built at once, and kept up to date through update_cells, match the moves worked out cell by cell
+@pytest.mark.parametrize('corners', CORNER_RULES)
+@pytest.mark.parametrize('diagonal', [True, False])
+@pytest.mark.parametrize('seed', range(8))
+def test_masks(seed, diagonal, corners):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 9, 11, density=0.35, costs=(1, 2, 255))
+    masks = NeighborMasks(grid, diagonal, corners)
+    check_masks(masks, grid)
+    for _ in range(10):
+        cells = [(rng.randrange(9), rng.randrange(11)) for _ in range(rng.randint(1, 4))]
+        for r, c in cells: grid[r][c] = rng.choice((0, 0, 1, 9))
+        masks.update_cells(cells)
+        check_masks(masks, grid)
+
+
+# Every mode must honour the corner rule: those that only implement 'allow' fall back to A* for the others
+@pytest.mark.parametrize('mode', ['A*', 'Bidirectional', 'ARA*', 'JPS+', 'HPA*', 'Flow'])
+@pytest.mark.parametrize('corners', CORNER_RULES)
+@pytest.mark.parametrize('seed', range(6))
+def test_corner_rules(seed, corners, mode):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 14, 16, density=0.35)
+    astar = AStar(grid, [0, 0], [0, 0], imported=True, mode=mode, corner_cutting=corners, weight=1.0)
+    for _ in range(8):
+        for _ in range(2):
+            src, dest = random_free_cell(rng, grid), random_free_cell(rng, grid)
+            expected = dijkstra(grid, src, True, corners).get(tuple(dest), INF)
+            astar.set_query(src, dest)
+            status = astar.a_star_search()
+            if expected == INF:
+                assert status == -3
+                continue
+            assert status == 0
+            cost = path_cost(grid, astar.trace_path(), True, corners)
+            if mode == 'HPA*' and corners == 'allow': assert cost >= expected - 1e-9
+            else: assert math.isclose(cost, expected)
+        cells = [(rng.randrange(14), rng.randrange(16)) for _ in range(rng.randint(1, 4))]
+        for r, c in cells: grid[r][c] = rng.choice((0, 1))
+        astar.update_cells(cells)
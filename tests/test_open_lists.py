@@ -0,0 +1,81 @@
+import math
+import random
+import pytest
+from astar import AStar
+from open_list import QUEUES
+from reference import dijkstra, path_cost, random_grid, random_free_cell, INF
+
+
+# Every queue pops in (f, h, index) order, decrease included; the lazy queues' outdated entries are skipped
+# the way search_cells skips them, by the cell having been popped already
+@pytest.mark.parametrize('kind', list(QUEUES))
+@pytest.mark.parametrize('seed', range(20))
+def test_pop_order(seed, kind):
+    rng = random.Random(seed)
+    queue = QUEUES[kind](200)
+    keys, popped = {}, set()
+    for _ in range(3):
+        for _ in range(400):
+            idx = rng.randrange(200)
+            if idx in popped: continue
+            f, h = rng.randrange(40, 120) / 2, rng.randrange(20)
+            if idx not in keys:
+                keys[idx] = (f, h)
+                queue.push(idx, f, h)
+            elif f < keys[idx][0]:
+                keys[idx] = (f, h)
+                queue.decrease(idx, f, h)
+        for _ in range(rng.randrange(len(keys) + 1)):
+            idx = queue.pop()
+            while idx in popped: idx = queue.pop()
+            assert idx == min(keys, key=lambda cell: (*keys[cell], cell))
+            del keys[idx]
+            popped.add(idx)
+        if kind == 'indexed': assert len(queue) == len(keys)
+        queue.clear()
+        keys, popped = {}, set()
+
+
+# With the same tie-breaking the three queues expand the same cells in the same order, so they agree on
+# the path itself, not just its cost
+@pytest.mark.parametrize('weight', [1.0, 2.0])
+@pytest.mark.parametrize('heuristic_type', ['Euclidean', 'Manhattan'])
+@pytest.mark.parametrize('seed', range(10))
+def test_queues_agree(seed, heuristic_type, weight):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 16, 20, costs=(1, 1, 2, 7))
+    diagonal = heuristic_type != 'Manhattan'
+    solvers = {kind: AStar(grid, [0, 0], [0, 0], heuristic_type=heuristic_type, imported=True, queue=kind, weight=weight) for kind in QUEUES}
+    for _ in range(5):
+        src, dest = random_free_cell(rng, grid), random_free_cell(rng, grid)
+        expected = dijkstra(grid, src, diagonal).get(tuple(dest), INF)
+        paths = {}
+        for kind, astar in solvers.items():
+            astar.set_query(src, dest)
+            status = astar.a_star_search()
+            paths[kind] = astar.trace_path() if status == 0 else None
+            assert status == (-3 if expected == INF else 0)
+        assert paths['indexed'] == paths['heap'] and paths['bucket'] == paths['heap']
+        if paths['heap'] is not None:
+            cost = path_cost(grid, paths['heap'], diagonal)
+            assert cost <= expected * weight + 1e-9
+            if weight == 1.0: assert math.isclose(cost, expected)
+
+
+# Cost and wall edits through update_cells, with the queues' buffers reused between queries
+@pytest.mark.parametrize('kind', list(QUEUES))
+@pytest.mark.parametrize('seed', range(10))
+def test_after_edits(seed, kind):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 14, 16, costs=(1, 1, 5))
+    astar = AStar(grid, [0, 0], [0, 0], heuristic_type='Manhattan', imported=True, queue=kind)
+    for _ in range(10):
+        src, dest = random_free_cell(rng, grid), random_free_cell(rng, grid)
+        expected = dijkstra(grid, src, False).get(tuple(dest), INF)
+        astar.set_query(src, dest)
+        status = astar.a_star_search()
+        if expected == INF: assert status == -3
+        else: assert status == 0 and math.isclose(path_cost(grid, astar.trace_path(), False), expected)
+        cells = [(rng.randrange(14), rng.randrange(16)) for _ in range(rng.randint(1, 4))]
+        for r, c in cells: grid[r][c] = rng.choice((0, 1, 5, 20))
+        astar.update_cells(cells)
@@ -0,0 +1,100 @@
+import math
+import random
+import pytest
+from astar import AStar
+from reference import dijkstra, path_cost, random_grid, random_free_cell, INF
+
+
+# Solve and check the status against the reference; returns (optimum, cost of the path found), or None
+def solve(astar, grid, diagonal):
+    expected = dijkstra(grid, astar.src, diagonal).get(tuple(astar.dest), INF)
+    status = astar.a_star_search()
+    if expected == INF:
+        assert status == -3
+        return None
+    assert status == 0
+    path = astar.trace_path()
+    assert path[0] == tuple(astar.src) and path[-1] == tuple(astar.dest)
+    return expected, path_cost(grid, path, diagonal)
+
+
+# Weighted A* paths cost at most weight times the optimum, and the bound it reports says so
+@pytest.mark.parametrize('weight', [1.0, 1.5, 3.0])
+@pytest.mark.parametrize('heuristic_type', ['Euclidean', 'Manhattan'])
+@pytest.mark.parametrize('seed', range(10))
+def test_weighted_astar_bound(seed, heuristic_type, weight):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 16, 20, costs=(1, 1, 2, 7))
+    astar = AStar(grid, [0, 0], [0, 0], heuristic_type=heuristic_type, imported=True, weight=weight)
+    for _ in range(5):
+        astar.set_query(random_free_cell(rng, grid), random_free_cell(rng, grid))
+        result = solve(astar, grid, heuristic_type != 'Manhattan')
+        if result is None or astar.src == astar.dest: continue
+        optimum, cost = result
+        assert astar.bound == weight
+        assert cost <= optimum * weight + 1e-9
+        if weight == 1.0: assert math.isclose(cost, optimum)
+
+
+# Without a time budget ARA* ends on the optimum; every round's path keeps within its own bound and the
+# bounds only tighten
+@pytest.mark.parametrize('heuristic_type', ['Euclidean', 'Manhattan'])
+@pytest.mark.parametrize('seed', range(10))
+def test_anytime_rounds(seed, heuristic_type):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 24, 24, costs=(1, 3, 8))
+    diagonal = heuristic_type != 'Manhattan'
+    astar = AStar(grid, [0, 0], [0, 0], heuristic_type=heuristic_type, imported=True, mode='ARA*', weight=4.0)
+    for _ in range(10):
+        astar.set_query(random_free_cell(rng, grid), random_free_cell(rng, grid))
+        result = solve(astar, grid, diagonal)
+        if result is None or astar.src == astar.dest: continue
+        optimum, cost = result
+        assert astar.bound == 1.0 and math.isclose(cost, optimum)
+        bounds = [bound for _, bound in astar.improvements]
+        assert bounds == sorted(bounds, reverse=True) and bounds[-1] == 1.0
+        for path, bound in astar.improvements: assert path_cost(grid, path, diagonal) <= optimum * bound + 1e-9
+        assert astar.improvements[-1][0] == astar.trace_path()
+
+
+# A budget too small for the later rounds still returns a path within the reported bound
+@pytest.mark.parametrize('seed', range(10))
+def test_anytime_budget(seed):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 30, 30, density=0.2, costs=(1, 2, 9))
+    src, dest = random_free_cell(rng, grid), random_free_cell(rng, grid)
+    astar = AStar(grid, src, dest, imported=True, mode='ARA*', weight=5.0, time_budget=1e-6)
+    result = solve(astar, grid, True)
+    if result is None or src == dest: return
+    optimum, cost = result
+    assert 1.0 <= astar.bound <= 5.0
+    assert cost <= optimum * astar.bound + 1e-9
+
+
+# Cost edits made through update_cells must be charged by the weighted searches too
+@pytest.mark.parametrize('mode', ['A*', 'ARA*'])
+@pytest.mark.parametrize('seed', range(10))
+def test_after_edits(seed, mode):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 14, 16, costs=(1, 1, 5))
+    astar = AStar(grid, [0, 0], [0, 0], imported=True, mode=mode, weight=2.0)
+    for _ in range(10):
+        astar.set_query(random_free_cell(rng, grid), random_free_cell(rng, grid))
+        result = solve(astar, grid, True)
+        if result is not None: assert result[1] <= result[0] * astar.bound + 1e-9
+        cells = [(rng.randrange(14), rng.randrange(16)) for _ in range(rng.randint(1, 4))]
+        for r, c in cells: grid[r][c] = rng.choice((0, 1, 5, 20))
+        astar.update_cells(cells)
+
+
+# Cells must be 0 or an integer cost from 1 to 255, both when the grid is given and when it is edited
+@pytest.mark.parametrize('value', [-1, 256, 0.5, 2.0, 'x', None])
+def test_invalid_costs(value):
+    grid = [[1, 1, 1], [1, value, 1], [1, 1, 1]]
+    with pytest.raises(ValueError):
+        AStar(grid, [0, 0], [2, 2], imported=True)
+    grid[1][1] = 1
+    astar = AStar(grid, [0, 0], [2, 2], imported=True)
+    grid[1][1] = value
+    with pytest.raises(ValueError):
+        astar.update_cells([(1, 1)])
@@ -0,0 +1,46 @@
+import os
+from collections import OrderedDict
+import pygame #type: ignore
+
+# Font files, found relative to this module so the GUI runs from any directory on any OS
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
+HEADING_FONT = os.path.join(FONT_DIR, 'AstronBoyWonder.ttf')
+REGULAR_FONT = os.path.join(FONT_DIR, 'basic_types', 'Roboto-Medium.ttf')
+
+_fonts = {}
+
+# Font for a file and size, opened on first use and shared by every caller; None is pygame's default font
+def get_font(path, size):
+    if (path, size) not in _fonts: _fonts[(path, size)] = pygame.font.Font(path, size)
+    return _fonts[(path, size)]
+
+
+# Bounded LRU cache of rendered text surfaces, so labels that do not change are rendered once
+class TextCache:
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, path, size, text, color, antialias=True):
+        key = (path, size, text, tuple(color), antialias)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        surface = self.entries[key] = get_font(path, size).render(text, antialias, color)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self): self.entries.clear()
+
+
+# The process-wide cache used by the GUI and its buttons
+text_cache = TextCache()
+
+def render(path, size, text, color, antialias=True): return text_cache.render(path, size, text, color, antialias)